@@ -1,10 +1,14 @@
 import logging
+import os
+import contextlib
 import numpy as np
 import random
-from collections import deque, defaultdict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import time
 import functools
+import itertools
 import tracemalloc
 
 def medir_tempo_memoria(func):
@@ -34,44 +38,181 @@ def medir_tempo_memoria(func):
                 pass
     return wrapper
 
+def _tipo_bitmask(n_nos):
+    """Menor tipo inteiro sem sinal capaz de guardar um bit por habilidade"""
+    for tipo in (np.uint16, np.uint32, np.uint64):
+        if n_nos <= np.iinfo(tipo).bits:
+            return tipo
+    raise ValueError(f"Grafo com {n_nos} nós excede o limite de 64 habilidades do bitmask de caminho")
+
+@functools.lru_cache(maxsize=None)
+def _ordenacao_topologica_cached(estrutura):
+    """
+    Ordenação topológica (Kahn) memoizada pela estrutura do grafo, uma tupla
+    ((no, (pre_req, ...)), ...) na ordem de inserção do dicionário.
+    """
+    nos = [no for no, _ in estrutura]
+    indice = {no: i for i, no in enumerate(nos)}
+    
+    # Construir grafo de dependências sobre índices inteiros (pré-requisito -> dependentes)
+    graus_entrada = [len(pre_reqs) for _, pre_reqs in estrutura]
+    dependentes = [[] for _ in nos]
+    for i, (_, pre_reqs) in enumerate(estrutura):
+        for prereq in pre_reqs:
+            if prereq in indice:
+                dependentes[indice[prereq]].append(i)
+    
+    # Encontrar nós sem dependências (grau de entrada 0)
+    fila = deque(i for i, grau in enumerate(graus_entrada) if grau == 0)
+    ordenacao = []
+    
+    while fila:
+        i = fila.popleft()
+        ordenacao.append(i)
+        
+        for vizinho in dependentes[i]:
+            graus_entrada[vizinho] -= 1
+            if graus_entrada[vizinho] == 0:
+                fila.append(vizinho)
+    
+    # Nós que sobram estão em ciclos (ou dependem de pré-requisitos inexistentes)
+    if len(ordenacao) != len(nos):
+        ordenados = set(ordenacao)
+        ciclos = [no for i, no in enumerate(nos) if i not in ordenados]
+        raise ValueError(f"Grafo contém ciclos - nós não ordenados: {ciclos}")
+    
+    ordenacao = [nos[i] for i in ordenacao]
+    logging.info(f"Ordenação topológica calculada: {ordenacao}")
+    return tuple(ordenacao)
+
+def _passo_dp(dp_no, caminho_no, dp_prereqs, caminho_prereqs,
+              inicio_t, inicio_c, valor_no, bit_no):
+    """
+    Atualiza in-place os planos (tempo, complexidade) de um nó.
+
+    dp_no/caminho_no chegam com o ramo "não incluir" (herdado do nó anterior);
+    só a região [inicio_t:, inicio_c:] é avaliada para o ramo "incluir".
+    dp_prereqs/caminho_prereqs são os planos dos pré-requisitos já recortados à
+    região de origem correspondente, empilhados em um array 3D
+    (n_prereqs, T+1-inicio_t, C+1-inicio_c).
+    """
+    # Viabilidade e valor saem da mesma leitura dos planos dos pré-requisitos;
+    # as reduções alocam um plano cada e o resto é feito in-place sobre eles
+    viavel = (dp_prereqs != 0).all(axis=0)
+    valor_com_no = dp_prereqs.sum(axis=0)
+    valor_com_no += valor_no
+    caminho_com_no = np.bitwise_or.reduce(caminho_prereqs, axis=0)
+    caminho_com_no |= caminho_no.dtype.type(bit_no)
+    
+    # Escolher o melhor entre incluir ou não o nó
+    destino = dp_no[inicio_t:, inicio_c:]
+    incluir = np.greater(valor_com_no, destino)
+    incluir &= viavel
+    np.copyto(destino, valor_com_no, where=incluir)
+    np.copyto(caminho_no[inicio_t:, inicio_c:], caminho_com_no, where=incluir)
+
+def _passo_dp_lote(dp_no, caminho_no, dp_prereqs, caminho_prereqs,
+                   tempos_no, inicio_t, inicio_c, valores_no, bit_no):
+    """
+    Versão de _passo_dp para um lote de cenários: os planos ganham um eixo de
+    cenário (n_cenarios, T+1, C+1) e tempos_no/valores_no são vetores por cenário.
+    Os planos dos pré-requisitos chegam recortados apenas em complexidade,
+    (n_prereqs, n_cenarios, T+1, C+1-inicio_c): como o deslocamento em
+    tempo varia por cenário, eles são lidos com np.take_along_axis.
+    """
+    n_tempos = dp_no.shape[1]
+    
+    indice_t = np.arange(inicio_t, n_tempos, dtype=np.int32)[None, :] - tempos_no[:, None]
+    alcancavel = (indice_t >= 0)[:, :, None]
+    indice_t = np.maximum(indice_t, 0)[None, :, :, None]
+    dp_desloc = np.take_along_axis(dp_prereqs, indice_t, axis=2)
+    caminho_desloc = np.take_along_axis(caminho_prereqs, indice_t, axis=2)
+    
+    viavel = (dp_desloc != 0).all(axis=0)
+    viavel &= alcancavel
+    valor_com_no = dp_desloc.sum(axis=0)
+    valor_com_no += valores_no[:, None, None]
+    caminho_com_no = np.bitwise_or.reduce(caminho_desloc, axis=0)
+    caminho_com_no |= caminho_no.dtype.type(bit_no)
+    
+    # Escolher o melhor entre incluir ou não o nó
+    destino = dp_no[:, inicio_t:, inicio_c:]
+    incluir = np.greater(valor_com_no, destino)
+    incluir &= viavel
+    np.copyto(destino, valor_com_no, where=incluir)
+    np.copyto(caminho_no[:, inicio_t:, inicio_c:], caminho_com_no, where=incluir)
+
+class _EstatisticaOnline:
+    """Média, variância populacional (Welford), mínimo e máximo acumulados amostra a amostra"""
+    __slots__ = ('n', 'media', 'm2', 'minimo', 'maximo')
+    
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+    
+    def adicionar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+        self.minimo = min(self.minimo, x)
+        self.maximo = max(self.maximo, x)
+    
+    @property
+    def desvio_padrao(self):
+        # Mesmo critério de np.std (ddof=0) usado antes
+        return (self.m2 / self.n) ** 0.5 if self.n > 0 else 0
+
 class OtimizadorCaminhoDP:
-    def __init__(self, grafo, tempo_max=350, complexidade_max=30, objetivo='S6'):
+    def __init__(self, grafo, tempo_max=350, complexidade_max=30, objetivo='S6', ordenacao_topologica=None):
         self.grafo = grafo
         self.tempo_max = tempo_max
         self.complexidade_max = complexidade_max
         self.objetivo = objetivo
-        self.ordenacao_topologica = self._calcular_ordenacao_topologica()
+        # A ordenação pode ser reaproveitada entre otimizadores com a mesma estrutura (ex.: Monte Carlo)
+        if ordenacao_topologica is None:
+            ordenacao_topologica = self._calcular_ordenacao_topologica()
+        self.ordenacao_topologica = list(ordenacao_topologica)
+        # Mapas de índice construídos uma única vez: posição de cada nó na ordenação
+        # e, por posição, as posições dos seus pré-requisitos (índices dos tensores DP)
+        self._indice_no = {no: i for i, no in enumerate(self.ordenacao_topologica)}
+        self._indices_prereqs = [
+            np.array([self._indice_no[p] for p in self.grafo[no]['Pre_Reqs']], dtype=np.int32)
+            for no in self.ordenacao_topologica
+        ]
+        self._resumos_caminho = {}
         
     def _calcular_ordenacao_topologica(self):
         """Calcula ordenação topológica do grafo para processamento em ordem correta"""
-        graus_entrada = {no: 0 for no in self.grafo}
-        arestas_saida = defaultdict(list)
-        
-        # Construir grafo de dependências
-        for no, dados in self.grafo.items():
-            for prereq in dados['Pre_Reqs']:
-                graus_entrada[no] += 1
-                arestas_saida[prereq].append(no)
-        
-        # Encontrar nós sem dependências (grau de entrada 0)
-        fila = deque([no for no in self.grafo if graus_entrada[no] == 0])
-        ordenacao = []
-        
-        while fila:
-            no = fila.popleft()
-            ordenacao.append(no)
-            
-            for vizinho in arestas_saida[no]:
-                graus_entrada[vizinho] -= 1
-                if graus_entrada[vizinho] == 0:
-                    fila.append(vizinho)
-        
-        if len(ordenacao) != len(self.grafo):
-            ciclos = [no for no in self.grafo if no not in ordenacao]
-            raise ValueError(f"Grafo contém ciclos - nós não ordenados: {ciclos}")
-        
-        logging.info(f"Ordenação topológica calculada: {ordenacao}")
-        return ordenacao
+        # Apenas a estrutura (nós e pré-requisitos) define a ordenação; Tempo e Valor não
+        estrutura = tuple((no, tuple(dados['Pre_Reqs'])) for no, dados in self.grafo.items())
+        return list(_ordenacao_topologica_cached(estrutura))
+    
+    def _limiares_inclusao(self, tempos_minimos):
+        """
+        Primeira célula (t, c) em que cada nó pode entrar no caminho.
+        alcance[i] é o menor t (c) com dp[i] != 0 — herdado ao longo da ordenação,
+        então um nó só é viável a partir de seu tempo (complexidade) mais o maior
+        alcance entre os pré-requisitos. Abaixo disso algum pré-requisito vale 0
+        e a célula nunca é incluída, então nem precisa ser avaliada.
+        """
+        infinito = float('inf')
+        alcance_t, alcance_c, limiares = [], [], []
+        for i, no in enumerate(self.ordenacao_topologica):
+            prereqs = self._indices_prereqs[i]
+            inicio_t = tempos_minimos[i] + max((alcance_t[p] for p in prereqs), default=0)
+            inicio_c = self.grafo[no]['Complexidade'] + max((alcance_c[p] for p in prereqs), default=0)
+            if inicio_t > self.tempo_max or inicio_c > self.complexidade_max:
+                inicio_t = inicio_c = infinito
+            anterior_t = alcance_t[-1] if alcance_t else infinito
+            anterior_c = alcance_c[-1] if alcance_c else infinito
+            alcance_t.append(min(anterior_t, inicio_t))
+            alcance_c.append(min(anterior_c, inicio_c))
+            limiares.append(None if inicio_t == infinito else (int(inicio_t), int(inicio_c)))
+        return limiares
     
     def knapsack_multidimensional_dp(self):
         """
@@ -81,79 +222,52 @@ class OtimizadorCaminhoDP:
         logging.info("Iniciando Programação Dinâmica multidimensional...")
         start_time = time.time()
         
-        # Inicializar estruturas DP
-        dp = {}  # dp[no][t][c] = valor máximo
-        caminho = {}  # caminho[no][t][c] = sequência de habilidades
-        pre_requisitos_map = {}  # Mapeamento de pré-requisitos
+        # Inicializar estruturas DP, indexadas pela posição do nó na ordenação topológica
+        n_nos = len(self.ordenacao_topologica)
+        forma = (self.tempo_max + 1, self.complexidade_max + 1)
+        dp = np.zeros((n_nos,) + forma, dtype=np.float32)  # dp[i][t][c] = valor máximo
+        caminho = np.zeros((n_nos,) + forma, dtype=_tipo_bitmask(n_nos))  # caminho[i][t][c] = bitmask (bit j = j-ésimo nó)
         
-        # Inicializar para todos os nós
-        for no in self.ordenacao_topologica:
-            dp[no] = np.zeros((self.tempo_max + 1, self.complexidade_max + 1))
-            caminho[no] = [[[] for _ in range(self.complexidade_max + 1)] 
-                        for _ in range(self.tempo_max + 1)]
-            pre_requisitos_map[no] = self.grafo[no]['Pre_Reqs']
+        limiares = self._limiares_inclusao([self.grafo[no]['Tempo'] for no in self.ordenacao_topologica])
         
         # Processar cada nó na ordem topológica
-        for no in self.ordenacao_topologica:
+        for i, no in enumerate(self.ordenacao_topologica):
             dados_no = self.grafo[no]
             tempo_no = dados_no['Tempo']
             valor_no = dados_no['Valor']
             complexidade_no = dados_no['Complexidade']
             
-            logging.debug(f"Processando nó {no}: T={tempo_no}, V={valor_no}, C={complexidade_no}")
+            logging.debug("Processando nó %s: T=%s, V=%s, C=%s", no, tempo_no, valor_no, complexidade_no)
             
-            for tempo in range(self.tempo_max + 1):
-                for comp in range(self.complexidade_max + 1):
-                    # Valor máximo herdado do nó anterior na ordenação
-                    valor_herdado = 0
-                    caminho_herdado = []
-                    
-                    if self.ordenacao_topologica.index(no) > 0:
-                        no_anterior = self.ordenacao_topologica[self.ordenacao_topologica.index(no) - 1]
-                        valor_herdado = dp[no_anterior][tempo][comp]
-                        caminho_herdado = caminho[no_anterior][tempo][comp]
-                    
-                    # Verificar se podemos incluir o nó atual
-                    valor_com_no = 0
-                    caminho_com_no = []
-                    
-                    if (tempo >= tempo_no and comp >= complexidade_no and
-                        self._verificar_pre_requisitos_satisfeitos(no, dp, tempo - tempo_no, comp - complexidade_no)):
-                        
-                        valor_com_no = valor_no
-                        caminho_com_no = [no]
-                        
-                        # Adicionar valor dos pré-requisitos (se houver)
-                        for prereq in pre_requisitos_map[no]:
-                            if prereq in dp:
-                                valor_com_no += dp[prereq][tempo - tempo_no][comp - complexidade_no]
-                                caminho_prereq = caminho[prereq][tempo - tempo_no][comp - complexidade_no]
-                                if caminho_prereq:
-                                    # Combinar caminhos mantendo a ordem
-                                    caminho_com_no = caminho_prereq + caminho_com_no
-                    
-                    # Escolher o melhor entre incluir ou não o nó
-                    if valor_com_no > valor_herdado:
-                        dp[no][tempo][comp] = valor_com_no
-                        caminho[no][tempo][comp] = caminho_com_no
-                    else:
-                        dp[no][tempo][comp] = valor_herdado
-                        caminho[no][tempo][comp] = caminho_herdado
-        
-        # Encontrar a melhor solução que inclui o nó objetivo
-        melhor_valor_total = 0
-        melhor_caminho_total = []
-        melhor_tempo_usado = 0
-        melhor_complexidade_usada = 0
-        
-        for tempo in range(self.tempo_max + 1):
-            for comp in range(self.complexidade_max + 1):
-                if self.objetivo in caminho[self.objetivo][tempo][comp]:
-                    if dp[self.objetivo][tempo][comp] > melhor_valor_total:
-                        melhor_valor_total = dp[self.objetivo][tempo][comp]
-                        melhor_caminho_total = caminho[self.objetivo][tempo][comp]
-                        melhor_tempo_usado = tempo
-                        melhor_complexidade_usada = comp
+            # Ramo "não incluir": valor herdado do nó anterior na ordenação
+            if i > 0:
+                dp[i] = dp[i - 1]
+                caminho[i] = caminho[i - 1]
+            
+            if limiares[i] is None:
+                continue
+            
+            # Ramo "incluir": célula (t, c) usa os pré-requisitos em (t - tempo_no, c - complexidade_no)
+            inicio_t, inicio_c = limiares[i]
+            origem = (
+                self._indices_prereqs[i],
+                slice(inicio_t - tempo_no, forma[0] - tempo_no),
+                slice(inicio_c - complexidade_no, forma[1] - complexidade_no)
+            )
+            _passo_dp(
+                dp[i], caminho[i], dp[origem], caminho[origem],
+                inicio_t, inicio_c, valor_no, 1 << i
+            )
+        
+        # Encontrar a melhor solução que inclui o nó objetivo (primeira célula em caso de empate)
+        idx_objetivo = self._indice_no[self.objetivo]
+        inclui_objetivo = ((caminho[idx_objetivo] >> idx_objetivo) & 1).astype(bool)
+        candidatos = np.where(inclui_objetivo, dp[idx_objetivo], -1)
+        melhor_tempo_usado, melhor_complexidade_usada = (
+            int(i) for i in np.unravel_index(candidatos.argmax(), candidatos.shape)
+        )
+        melhor_valor_total = max(float(candidatos[melhor_tempo_usado, melhor_complexidade_usada]), 0)
+        melhor_caminho_bits = int(caminho[idx_objetivo, melhor_tempo_usado, melhor_complexidade_usada])
         
         end_time = time.time()
         logging.info(f"DP concluída em {end_time - start_time:.2f} segundos")
@@ -161,6 +275,11 @@ class OtimizadorCaminhoDP:
         if melhor_valor_total == 0:
             raise ValueError(f"Não foi possível encontrar caminho válido para {self.objetivo} com as restrições fornecidas")
         
+        # Decodificar o bitmask na sequência de habilidades (ordem topológica)
+        melhor_caminho_total = [
+            no for i, no in enumerate(self.ordenacao_topologica) if melhor_caminho_bits >> i & 1
+        ]
+        
         return {
             'valor_maximo': melhor_valor_total,
             'caminho_otimo': melhor_caminho_total,
@@ -174,18 +293,83 @@ class OtimizadorCaminhoDP:
             }
         }
     
-    def _verificar_pre_requisitos_satisfeitos(self, no, dp, tempo, complexidade):
-        """Verifica se todos os pré-requisitos podem ser satisfeitos com os recursos dados"""
-        for prereq in self.grafo[no]['Pre_Reqs']:
-            if prereq not in dp or dp[prereq][tempo][complexidade] == 0:
-                return False
-        return True
+    def knapsack_multidimensional_dp_lote(self, tempos, valores, buffers=None):
+        """
+        Mesma DP de knapsack_multidimensional_dp, resolvida de uma vez para vários
+        cenários. tempos/valores têm forma (n_cenarios, n_nos), com as colunas na
+        ordem topológica; a complexidade e os pré-requisitos são comuns a todos.
+        Retorna, por cenário, (valor, caminho, tempo, complexidade) ou None se
+        não houver caminho válido até o objetivo.
+        
+        buffers é um par opcional (dp, caminho) de forma (n_nos, >= n_cenarios, T+1, C+1),
+        reaproveitado entre chamadas em vez de alocar os tensores a cada lote.
+        """
+        # float32/int32 em toda a DP: metade da banda de memória de float64
+        tempos = np.asarray(tempos, dtype=np.int32)
+        valores = np.asarray(valores, dtype=np.float32)
+
+        n_cenarios = tempos.shape[0]
+        n_nos = len(self.ordenacao_topologica)
+        forma = (n_cenarios, self.tempo_max + 1, self.complexidade_max + 1)
+        # O menor tempo do lote dá um limiar válido para todos os cenários
+        limiares = self._limiares_inclusao(tempos.min(axis=0).tolist())
+        
+        if buffers is None:
+            dp = np.zeros((n_nos,) + forma, dtype=np.float32)  # dp[i][cenario][t][c] = valor máximo
+            caminho = np.zeros((n_nos,) + forma, dtype=_tipo_bitmask(n_nos))  # caminho[i][cenario][t][c] = bitmask
+        else:
+            dp, caminho = (buffer[:, :n_cenarios] for buffer in buffers)
+            # Basta zerar o primeiro plano: os demais são sobrescritos pela herança abaixo
+            dp[0] = 0
+            caminho[0] = 0
+        for i, no in enumerate(self.ordenacao_topologica):
+            if i > 0:
+                dp[i] = dp[i - 1]
+                caminho[i] = caminho[i - 1]
+            
+            if limiares[i] is None:
+                continue
+            
+            complexidade_no = self.grafo[no]['Complexidade']
+            inicio_t, inicio_c = limiares[i]
+            origem = (self._indices_prereqs[i], slice(None), slice(None), slice(inicio_c - complexidade_no, forma[2] - complexidade_no))
+            _passo_dp_lote(
+                dp[i], caminho[i], dp[origem], caminho[origem],
+                tempos[:, i], inicio_t, inicio_c, valores[:, i], 1 << i
+            )
+        
+        # Melhor célula por cenário entre as que incluem o objetivo (primeira em caso de empate)
+        idx_objetivo = self._indice_no[self.objetivo]
+        inclui_objetivo = ((caminho[idx_objetivo] >> idx_objetivo) & 1).astype(bool)
+        candidatos = np.where(inclui_objetivo, dp[idx_objetivo], 0).reshape(n_cenarios, -1)
+        melhores = candidatos.argmax(axis=1)
+        
+        resultados = []
+        for k, celula in enumerate(melhores):
+            valor = float(candidatos[k, celula])
+            if valor <= 0:
+                resultados.append(None)
+                continue
+            tempo, comp = divmod(int(celula), forma[2])
+            bits = int(caminho[idx_objetivo, k, tempo, comp])
+            caminho_k = [no for i, no in enumerate(self.ordenacao_topologica) if bits >> i & 1]
+            resultados.append((valor, caminho_k, tempo, comp))
+        return resultados
     
     @medir_tempo_memoria
-    def simulacao_monte_carlo(self, n_simulacoes=1000):
+    def simulacao_monte_carlo(self, n_simulacoes=1000, n_processos=None, tamanho_lote=64, semente=None,
+                               max_amostras=10000):
         """
         Simulação Monte Carlo com incerteza nos parâmetros
         V ~ Uniforme[V-10%, V+10%], T ~ Uniforme[T-10%, T+10%]
+        
+        Os cenários são agrupados em lotes de tamanho_lote, cada lote resolvido
+        por uma única DP vetorizada; os lotes são executados em paralelo em um
+        pool de processos (n_processos=None usa todos os núcleos disponíveis);
+        com n_processos=1 ou um único lote, rodam no próprio processo.
+        
+        As estatísticas são acumuladas online; as listas por cenário guardam no
+        máximo ~max_amostras cenários válidos (um a cada n_simulacoes // max_amostras).
         """
         logging.info(f"Iniciando simulação Monte Carlo com {n_simulacoes} cenários")
         start_time = time.time()
@@ -194,45 +378,66 @@ class OtimizadorCaminhoDP:
         caminhos_validos = []
         tempos_utilizados = []
         complexidades_utilizadas = []
+        estat_valor = _EstatisticaOnline()
+        estat_tempo = _EstatisticaOnline()
+        estat_complexidade = _EstatisticaOnline()
+        passo_amostra = max(1, n_simulacoes // max_amostras)
+        
+        # Todos os fatores de incerteza em uma única chamada ao gerador (PCG64).
+        # Sem semente explícita, ela é derivada do gerador global (reprodutível via random.seed)
+        rng = np.random.default_rng(semente if semente is not None else random.getrandbits(32))
+        perturbacoes = rng.uniform(0.9, 1.1, size=(n_simulacoes, len(self.ordenacao_topologica), 2)).astype(np.float32)
+        lotes = [perturbacoes[i:i + tamanho_lote] for i in range(0, n_simulacoes, tamanho_lote)]
+        simular = functools.partial(
+            _simular_lote_monte_carlo,
+            grafo=self.grafo,
+            tempo_max=self.tempo_max,
+            complexidade_max=self.complexidade_max,
+            objetivo=self.objetivo,
+            ordenacao_topologica=self.ordenacao_topologica,
+            tempos_base=np.array([self.grafo[no]['Tempo'] for no in self.ordenacao_topologica], dtype=np.float64),
+            valores_base=np.array([self.grafo[no]['Valor'] for no in self.ordenacao_topologica], dtype=np.float64)
+        )
         
-        for i in range(n_simulacoes):
-            if i % 100 == 0:
-                logging.info(f"Simulação {i}/{n_simulacoes}")
-            
-            # Criar cópia do grafo com valores incertos
-            grafo_incerto = {}
-            for no, dados in self.grafo.items():
-                valor_incerto = dados['Valor'] * random.uniform(0.9, 1.1)
-                tempo_incerto = dados['Tempo'] * random.uniform(0.9, 1.1)
-                
-                grafo_incerto[no] = {
-                    'Nome': dados['Nome'],
-                    'Tempo': int(tempo_incerto),
-                    'Valor': valor_incerto,
-                    'Complexidade': dados['Complexidade'],
-                    'Pre_Reqs': dados['Pre_Reqs']
-                }
-            
-            # Executar DP para este cenário
-            try:
-                otimizador_incerto = OtimizadorCaminhoDP(
-                    grafo_incerto, self.tempo_max, self.complexidade_max, self.objetivo
-                )
-                resultado_incerto = otimizador_incerto.knapsack_multidimensional_dp()
+        n_processos = n_processos or os.cpu_count() or 1
+        intervalo_log = max(1, n_simulacoes // 10)
+        # Com um só processo ou um só lote o pool só acrescentaria o custo de criar os
+        # workers e serializar o grafo: os lotes rodam aqui mesmo, visíveis ao tracemalloc
+        serial = n_processos == 1 or len(lotes) <= 1
+        if serial:
+            executor = contextlib.nullcontext()
+            mapear = map
+        else:
+            executor = ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_processo_monte_carlo)
+            mapear = executor.map
+        with executor:
+            resultados = itertools.chain.from_iterable(mapear(simular, lotes))
+            for i, (resultado_incerto, erro) in enumerate(resultados):
+                if i % intervalo_log == 0:
+                    logging.info("Simulação %d/%d", i, n_simulacoes)
                 
-                valores_totais.append(resultado_incerto['valor_maximo'])
-                caminhos_validos.append(resultado_incerto['caminho_otimo'])
-                tempos_utilizados.append(resultado_incerto['tempo_utilizado'])
-                complexidades_utilizadas.append(resultado_incerto['complexidade_utilizada'])
+                if erro is not None:
+                    logging.warning("Erro na simulação %d: %s", i, erro)
+                    continue
                 
-            except Exception as e:
-                logging.warning(f"Erro na simulação {i}: {e}")
-                continue
+                valor, caminho, tempo, complexidade = resultado_incerto
+                if estat_valor.n % passo_amostra == 0:
+                    valores_totais.append(valor)
+                    caminhos_validos.append(caminho)
+                    tempos_utilizados.append(tempo)
+                    complexidades_utilizadas.append(complexidade)
+                estat_valor.adicionar(valor)
+                estat_tempo.adicionar(tempo)
+                estat_complexidade.adicionar(complexidade)
+        
+        if serial:
+            # Os tensores da DP ficariam presos no processo principal após a simulação
+            _liberar_buffers_lote()
         
         # Análise estatística
-        valores_array = np.array(valores_totais)
-        tempos_array = np.array(tempos_utilizados)
-        complexidades_array = np.array(complexidades_utilizadas)
+        n_validos = estat_valor.n
+        media = estat_valor.media
+        desvio = estat_valor.desvio_padrao
         
         end_time = time.time()
         logging.info(f"Monte Carlo concluído em {end_time - start_time:.2f} segundos")
@@ -242,19 +447,19 @@ class OtimizadorCaminhoDP:
             'caminhos_simulados': caminhos_validos,
             'tempos_utilizados': tempos_utilizados,
             'complexidades_utilizadas': complexidades_utilizadas,
-            'media_valor': np.mean(valores_array) if len(valores_array) > 0 else 0,
-            'desvio_padrao_valor': np.std(valores_array) if len(valores_array) > 0 else 0,
-            'media_tempo': np.mean(tempos_array) if len(tempos_array) > 0 else 0,
-            'media_complexidade': np.mean(complexidades_array) if len(complexidades_array) > 0 else 0,
-            'valor_minimo': np.min(valores_array) if len(valores_array) > 0 else 0,
-            'valor_maximo': np.max(valores_array) if len(valores_array) > 0 else 0,
-            'coef_variacao': (np.std(valores_array) / np.mean(valores_array)) if len(valores_array) > 0 and np.mean(valores_array) > 0 else 0,
+            'media_valor': media if n_validos > 0 else 0,
+            'desvio_padrao_valor': desvio,
+            'media_tempo': estat_tempo.media if n_validos > 0 else 0,
+            'media_complexidade': estat_complexidade.media if n_validos > 0 else 0,
+            'valor_minimo': estat_valor.minimo if n_validos > 0 else 0,
+            'valor_maximo': estat_valor.maximo if n_validos > 0 else 0,
+            'coef_variacao': (desvio / media) if n_validos > 0 and media > 0 else 0,
             'intervalo_confianca_95': (
-                np.mean(valores_array) - 1.96 * np.std(valores_array) / np.sqrt(len(valores_array)),
-                np.mean(valores_array) + 1.96 * np.std(valores_array) / np.sqrt(len(valores_array))
-            ) if len(valores_array) > 0 else (0, 0),
-            'cenarios_validos': len(valores_totais),
-            'taxa_sucesso': len(valores_totais) / n_simulacoes
+                media - 1.96 * desvio / np.sqrt(n_validos),
+                media + 1.96 * desvio / np.sqrt(n_validos)
+            ) if n_validos > 0 else (0, 0),
+            'cenarios_validos': n_validos,
+            'taxa_sucesso': n_validos / n_simulacoes
         }
     
     def comparar_solucoes_deterministica_estocastica(self, resultado_deterministico, resultado_monte_carlo):
@@ -301,6 +506,19 @@ class OtimizadorCaminhoDP:
             }
         }
     
+    def _resumo_caminho(self, caminho):
+        """
+        Tabela (n, 3) com Tempo, Valor e Complexidade de cada habilidade do caminho
+        e sua soma acumulada; memoizada por caminho para o relatório e a visualização.
+        """
+        chave = tuple(caminho)
+        if chave not in self._resumos_caminho:
+            dados = np.array(
+                [[self.grafo[h][k] for k in ('Tempo', 'Valor', 'Complexidade')] for h in chave]
+            ).reshape(-1, 3)
+            self._resumos_caminho[chave] = (dados, np.cumsum(dados, axis=0))
+        return self._resumos_caminho[chave]
+    
     def gerar_relatorio_detalhado(self, resultado_deterministico, resultado_monte_carlo, comparacao):
         """Gera relatório detalhado do Desafio 1"""
         print("=" * 80)
@@ -325,16 +543,12 @@ class OtimizadorCaminhoDP:
         # Detalhamento do caminho
         print("📝 DETALHAMENTO DO CAMINHO ÓTIMO:")
         print("-" * 35)
-        tempo_acumulado = 0
-        complexidade_acumulada = 0
-        valor_acumulado = 0
+        caminho = resultado_deterministico['caminho_otimo']
+        _, acumulados = self._resumo_caminho(caminho)
         
-        for i, habilidade in enumerate(resultado_deterministico['caminho_otimo'], 1):
+        for i, (habilidade, (tempo_acumulado, valor_acumulado, complexidade_acumulada)) in enumerate(
+                zip(caminho, acumulados.tolist()), 1):
             dados = self.grafo[habilidade]
-            tempo_acumulado += dados['Tempo']
-            complexidade_acumulada += dados['Complexidade']
-            valor_acumulado += dados['Valor']
-            
             print(f"  {i}. {habilidade} - {dados['Nome']}")
             print(f"     ⏱️  {dados['Tempo']}h (Acum: {tempo_acumulado}h) | ")
             print(f"💰 {dados['Valor']} (Acum: {valor_acumulado}) | ")
@@ -415,16 +629,15 @@ class OtimizadorCaminhoDP:
         
         # Gráfico 2: Caminho Ótimo e Recursos
         caminho = resultado_deterministico['caminho_otimo']
-        tempos = [self.grafo[h]['Tempo'] for h in caminho]
-        valores = [self.grafo[h]['Valor'] for h in caminho]
-        complexidades = [self.grafo[h]['Complexidade'] for h in caminho]
+        # Colunas Tempo, Valor, Complexidade (mesma tabela do relatório)
+        dados_caminho, _ = self._resumo_caminho(caminho)
         
         x = np.arange(len(caminho))
         largura = 0.25
         
-        bars1 = ax2.bar(x - largura, tempos, largura, label='Tempo (h)', color='lightblue', edgecolor='navy')
-        bars2 = ax2.bar(x, valores, largura, label='Valor', color='lightgreen', edgecolor='darkgreen')
-        bars3 = ax2.bar(x + largura, complexidades, largura, label='Complexidade', color='lightcoral', edgecolor='darkred')
+        bars1 = ax2.bar(x - largura, dados_caminho[:, 0], largura, label='Tempo (h)', color='lightblue', edgecolor='navy')
+        bars2 = ax2.bar(x, dados_caminho[:, 1], largura, label='Valor', color='lightgreen', edgecolor='darkgreen')
+        bars3 = ax2.bar(x + largura, dados_caminho[:, 2], largura, label='Complexidade', color='lightcoral', edgecolor='darkred')
         
         ax2.set_title('Caminho Ótimo - Composição por Habilidade')
         ax2.set_xlabel('Sequência no Caminho')
@@ -436,10 +649,7 @@ class OtimizadorCaminhoDP:
         
         # Adicionar valores nas barras
         for bars in [bars1, bars2, bars3]:
-            for bar in bars:
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                        f'{height:.0f}', ha='center', va='bottom', fontsize=8)
+            ax2.bar_label(bars, fmt='%.0f', padding=2, fontsize=8)
         
         # Gráfico 3: Utilização de Recursos
         recursos = ['Tempo', 'Complexidade']
@@ -459,10 +669,8 @@ class OtimizadorCaminhoDP:
         ax3.grid(axis='y', alpha=0.3)
         
         # Adicionar porcentagens
-        for i, (bar, perc) in enumerate(zip(bars, utilizacao_percent)):
-            height = bar.get_height()
-            ax3.text(bar.get_x() + bar.get_width()/2., height + 2, 
-                    f'{perc:.1f}%', ha='center', va='bottom', fontweight='bold')
+        ax3.bar_label(bars, labels=[f'{perc:.1f}%' for perc in utilizacao_percent],
+                      padding=2, fontweight='bold')
         
         # Gráfico 4: Análise de Sensibilidade
         diferenca = comparacao['comparacao']['diferenca_relativa']
@@ -488,10 +696,7 @@ class OtimizadorCaminhoDP:
         ax4.grid(axis='y', alpha=0.3)
         
         # Adicionar valores
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height + 1, 
-                    f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+        ax4.bar_label(bars, fmt='%.1f%%', padding=2, fontweight='bold')
         
         ax4.axhline(5, color='green', linestyle='--', alpha=0.5, label='Limite Ideal')
         ax4.axhline(10, color='orange', linestyle='--', alpha=0.5, label='Limite Aceitável')
@@ -500,6 +705,52 @@ class OtimizadorCaminhoDP:
         plt.tight_layout()
         return fig
 
+def _inicializar_processo_monte_carlo():
+    """
+    Desliga o tracemalloc herdado via fork: medir_tempo_memoria mede o processo
+    principal, e o rastreamento nos workers deixaria cada cenário dezenas de vezes mais lento.
+    """
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+_buffers_lote = None
+
+def _liberar_buffers_lote():
+    """Descarta os tensores da DP reaproveitados entre lotes"""
+    global _buffers_lote
+    _buffers_lote = None
+
+def _simular_lote_monte_carlo(perturbacoes, grafo, tempo_max, complexidade_max, objetivo,
+                              ordenacao_topologica, tempos_base, valores_base):
+    """
+    Executa um lote de cenários Monte Carlo em uma única DP vetorizada (função
+    de módulo para poder ser enviada aos processos do pool). tempos_base e
+    valores_base seguem a ordem topológica; perturbacoes tem forma
+    (n_cenarios, n_nos, 2) com os fatores de tempo ([..., 0]) e valor ([..., 1]).
+    Retorna uma lista de (resultado, erro), onde resultado é a tupla
+    (valor, caminho, tempo, complexidade).
+    """
+    otimizador = OtimizadorCaminhoDP(grafo, tempo_max, complexidade_max, objetivo, ordenacao_topologica)
+    
+    # Tensores da DP alocados uma vez por processo e reaproveitados pelos lotes seguintes
+    global _buffers_lote
+    forma = (len(ordenacao_topologica), len(perturbacoes), tempo_max + 1, complexidade_max + 1)
+    tipo_caminho = _tipo_bitmask(forma[0])
+    if (_buffers_lote is None or _buffers_lote[1].dtype != tipo_caminho
+            or np.delete(_buffers_lote[0].shape, 1).tolist() != np.delete(forma, 1).tolist()
+            or _buffers_lote[0].shape[1] < forma[1]):
+        _buffers_lote = (np.empty(forma, dtype=np.float32), np.empty(forma, dtype=tipo_caminho))
+    
+    # Parâmetros incertos de cada cenário: linhas = cenários, colunas = ordem topológica
+    tempos = (tempos_base * perturbacoes[:, :, 0]).astype(np.int32)
+    valores = (valores_base * perturbacoes[:, :, 1]).astype(np.float32)
+    
+    erro = f"Não foi possível encontrar caminho válido para {objetivo} com as restrições fornecidas"
+    return [
+        (resultado, None) if resultado is not None else (None, erro)
+        for resultado in otimizador.knapsack_multidimensional_dp_lote(tempos, valores, _buffers_lote)
+    ]
+
 def executar_desafio1(grafo, tempo_max=350, complexidade_max=30, n_simulacoes=1000):
     """
     Função principal do Desafio 1
@@ -1,93 +1,308 @@
 import logging
-import itertools
-from collections import deque, defaultdict
-import matplotlib.pyplot as plt
-import time
+import os
+import functools
+import math
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 class VerificadorDesafio2:
+    # Acima deste número de habilidades críticas as k! ordens não são mais enumeradas
+    LIMITE_PERMUTACOES = 8
+
     def __init__(self, habilidades, habilidades_criticas):
         self.habilidades = habilidades
         self.habilidades_criticas = habilidades_criticas
         self.ids = set(habilidades.keys())
         self.resultados = []
         self.relatorios_validacao = None
+        # Estruturas planas indexadas pela posição da habilidade no dicionário:
+        # tempos, pré-requisitos existentes (como índices) e as habilidades críticas
+        self.indices = {h: i for i, h in enumerate(habilidades)}
+        self.nomes = list(habilidades)
+        self.tempos = [habilidades[h]['Tempo'] for h in habilidades]
+        self.pre_reqs_indices = []
+        self.pre_reqs_inexistentes = set()
+        for h in habilidades:
+            existentes = []
+            for pre in habilidades[h]['Pre_Reqs']:
+                if pre in self.indices:
+                    existentes.append(self.indices[pre])
+                else:
+                    self.pre_reqs_inexistentes.add((h, pre))
+            self.pre_reqs_indices.append(tuple(existentes))
+        self.indices_criticas = [self.indices[c] for c in habilidades_criticas]
+        # tabela_pesos[b][v] = soma dos tempos dos bits ligados em v no b-ésimo byte da máscara
+        self.tabela_pesos = []
+        for b in range(0, len(self.tempos), 8):
+            tabela = [0] * 256
+            for v in range(1, 256):
+                menor = (v & -v).bit_length() - 1
+                tabela[v] = tabela[v & (v - 1)] + (self.tempos[b + menor] if b + menor < len(self.tempos) else 0)
+            self.tabela_pesos.append(tabela)
+        self.ordem_topologica = None
+        self.fechos = None
 
     def validar_grafo(self):
-        visitados = set()
-        stack = set()
+        """
+        Valida o grafo em uma única passada iterativa (Kahn) sobre os índices:
+        pré-requisitos inexistentes já foram coletados no __init__, e os nós que
+        sobram sem ser ordenados estão em ciclos (ou dependem de um ciclo).
+        """
+        graus_entrada = [len(pre_reqs) for pre_reqs in self.pre_reqs_indices]
+        sucessores = [[] for _ in self.pre_reqs_indices]
+        for i, pre_reqs in enumerate(self.pre_reqs_indices):
+            for pre in pre_reqs:
+                sucessores[pre].append(i)
+
+        fila = deque(i for i, grau in enumerate(graus_entrada) if grau == 0)
+        ordem = []
+        while fila:
+            i = fila.popleft()
+            ordem.append(i)
+            for sucessor in sucessores[i]:
+                graus_entrada[sucessor] -= 1
+                if graus_entrada[sucessor] == 0:
+                    fila.append(sucessor)
+
         ciclos = []
-        pre_reqs_inexistentes = []
-
-        def dfs(n, caminho):
-            visitados.add(n)
-            stack.add(n)
-            for pre in self.habilidades[n]['Pre_Reqs']:
-                if pre not in self.ids:
-                    pre_reqs_inexistentes.append((n, pre))
-                elif pre not in visitados:
-                    dfs(pre, caminho + [pre])
-                elif pre in stack:
-                    ciclos.append(caminho + [pre])
-            stack.remove(n)
-        for hab in self.habilidades:
-            if hab not in visitados:
-                dfs(hab, [hab])
+        if len(ordem) < len(self.pre_reqs_indices):
+            # Nós não ordenados como bitmask (bit i = i-ésima habilidade)
+            ordenados = 0
+            for i in ordem:
+                ordenados |= 1 << i
+            restantes = ((1 << len(self.pre_reqs_indices)) - 1) & ~ordenados
+            ciclos.append(self._reconstruir_ciclo(restantes))
+
+        self.ordem_topologica = [self.nomes[i] for i in ordem]
+        pre_reqs_inexistentes = sorted(self.pre_reqs_inexistentes)
         self.relatorios_validacao = {
             'valido': not ciclos and not pre_reqs_inexistentes,
             'ciclos': ciclos,
             'pre_requisitos_inexistentes': pre_reqs_inexistentes
         }
+        if self.relatorios_validacao['valido']:
+            self._calcular_fechos(ordem)
         return self.relatorios_validacao
 
+    def _reconstruir_ciclo(self, restantes):
+        """
+        Todo nó que sobra do Kahn tem um pré-requisito também restante; seguindo
+        esses pré-requisitos a partir de qualquer um deles, algum nó se repete.
+        Só ponteiros para o nó anterior são guardados durante a caminhada; a lista
+        é montada apenas para o ciclo, voltando pelos ponteiros a partir da aresta de retorno.
+        restantes e os nós já visitados são bitmasks sobre os índices das habilidades.
+        """
+        anterior = {}
+        visitados = 0
+        pai, no = None, (restantes & -restantes).bit_length() - 1
+        while not visitados >> no & 1:
+            visitados |= 1 << no
+            anterior[no] = pai
+            pai, no = no, next(pre for pre in self.pre_reqs_indices[no] if restantes >> pre & 1)
+        ciclo = [pai]
+        while ciclo[-1] != no:
+            ciclo.append(anterior[ciclo[-1]])
+        return [self.nomes[i] for i in reversed(ciclo)] + [self.nomes[no]]
+
+    def _calcular_fechos(self, ordem):
+        """
+        Fecho de pré-requisitos de cada habilidade como bitmask inteiro (bit i =
+        i-ésima habilidade): a própria habilidade OR os fechos dos seus
+        pré-requisitos, percorrendo os índices na ordem topológica.
+        """
+        self.fechos = [0] * len(self.pre_reqs_indices)
+        for i in ordem:
+            fecho = 1 << i
+            for pre in self.pre_reqs_indices[i]:
+                fecho |= self.fechos[pre]
+            self.fechos[i] = fecho
+        return self.fechos
+
+    def _obter_fechos(self):
+        """Fechos de pré-requisitos, validando o grafo primeiro se necessário"""
+        if self.fechos is None:
+            self.validar_grafo()
+        if self.fechos is None:
+            raise ValueError(f"Grafo inválido: {self.relatorios_validacao}")
+        return self.fechos
+
+    def _tempo_bits(self, bits):
+        """Soma dos tempos das habilidades cujos bits estão ligados (uma consulta por byte)"""
+        total = 0
+        for tabela in self.tabela_pesos:
+            total += tabela[bits & 0xFF]
+            bits >>= 8
+        return total
+
+    def _custos_subconjuntos(self):
+        """
+        Programação dinâmica sobre subconjuntos das habilidades críticas (Held-Karp).
+
+        tempo[S] é o tempo total já gasto depois de adquirir o subconjunto S: a
+        soma dos tempos da união (OR) dos fechos de S, que não depende da ordem.
+        melhor[S] = min sobre c em S de melhor[S - c] + (tempo[S] - tempo[S - c]),
+        e anterior[S] guarda a última crítica de uma ordem ótima para S.
+        Complexidade O(k * 2^k) em vez de O(k!).
+        """
+        fechos = self._obter_fechos()
+        # Consultas invariantes resolvidas fora dos laços
+        k = len(self.indices_criticas)
+        fechos_criticas = [fechos[i] for i in self.indices_criticas]
+        tempo_bits = self._tempo_bits
+        n_subconjuntos = 1 << k
+
+        adquiridas = [0] * n_subconjuntos
+        tempo = [0] * n_subconjuntos
+        for mascara in range(1, n_subconjuntos):
+            # Subconjunto = subconjunto sem o bit mais baixo + a crítica desse bit
+            base = mascara & (mascara - 1)
+            j = (mascara & -mascara).bit_length() - 1
+            adquiridas[mascara] = adquiridas[base] | fechos_criticas[j]
+            tempo[mascara] = tempo[base] + tempo_bits(adquiridas[mascara] & ~adquiridas[base])
+
+        # Nenhuma ordem custa menos que tempo[S] (a união precisa ser adquirida de
+        # qualquer jeito): ao atingir esse limite inferior, as demais transições são podadas
+        melhor = [0] + [float('inf')] * (n_subconjuntos - 1)
+        anterior = [None] * n_subconjuntos
+        for mascara in range(1, n_subconjuntos):
+            for j in range(k):
+                if mascara >> j & 1:
+                    sem_j = mascara ^ (1 << j)
+                    custo = melhor[sem_j] + tempo[mascara] - tempo[sem_j]
+                    if custo < melhor[mascara]:
+                        melhor[mascara] = custo
+                        anterior[mascara] = j
+                        if custo <= tempo[mascara]:
+                            break
+        return tempo, melhor, anterior
+
     def calcular_custo_ordem(self, ordem):
         """
         Calcula o custo total para uma dada permutação, garantindo que o tempo
-        de cada habilidade seja contado apenas uma vez.
+        de cada habilidade seja contado apenas uma vez: o OR dos fechos das
+        habilidades da ordem marca cada habilidade adquirida uma única vez.
         """
-        tempo_total = 0
-        habilidades_adquiridas = set()
-
-        # Função auxiliar para adquirir uma habilidade e suas dependências recursivamente
-        def adquirir_habilidade(hab_id):
-            nonlocal tempo_total, habilidades_adquiridas
-            
-            # Se já foi adquirida, não há custo.
-            if hab_id in habilidades_adquiridas:
-                return
-
-            # Primeiro, garante que todos os pré-requisitos sejam adquiridos
-            for pre_req in self.habilidades[hab_id].get('Pre_Reqs', []):
-                adquirir_habilidade(pre_req)
-
-            # Após garantir os pré-requisitos, adquire a habilidade atual
-            # (se ela ainda não tiver sido adquirida como pré-requisito de outra)
-            if hab_id not in habilidades_adquiridas:
-                tempo_total += self.habilidades[hab_id]['Tempo']
-                habilidades_adquiridas.add(hab_id)
-
-        # Itera sobre a ordem da permutação, adquirindo cada habilidade crítica
+        fechos = self._obter_fechos()
+        indices = self.indices
+        adquiridas = 0
         for habilidade_critica in ordem:
-            adquirir_habilidade(habilidade_critica)
-            
-        return tempo_total
-
-    def analisar_permutacoes(self):
-        permutacoes = list(itertools.permutations(self.habilidades_criticas))
-        custos = []
-        for perm in permutacoes:
-            custo = self.calcular_custo_ordem(perm)
-            custos.append({'permutacao': perm, 'custo_total': custo})
-        custos.sort(key=lambda x: x['custo_total'])
-        return custos
-
-    def gerar_relatorio(self, custos):
-        melhores = custos[:3]
-        custo_medio = sum(x['custo_total'] for x in custos) / len(custos)
+            adquiridas |= fechos[indices[habilidade_critica]]
+        return self._tempo_bits(adquiridas)
+
+    # Quantas ordens representativas o resumo guarda (as exibidas no relatório e no gráfico)
+    N_MELHORES = 10
+
+    def analisar_permutacoes(self, n_processos=1):
+        """
+        Resumo dos custos das ordens das habilidades críticas, agrupadas em classes
+        de equivalência: a chave de uma ordem é a sequência das críticas que de fato
+        acrescentaram habilidades novas (as demais já estavam no fecho adquirido).
+        Retorna as N_MELHORES classes (ordem representativa, custo, ocorrências) e
+        as estatísticas agregadas; as k! ordens nunca são guardadas.
+
+        Com n_processos > 1 as k! ordens são divididas em blocos contíguos
+        classificados em paralelo em um pool de processos (n_processos=None usa
+        todos os núcleos); com poucas críticas o custo do pool não compensa.
+        """
+        if len(self.habilidades_criticas) > self.LIMITE_PERMUTACOES:
+            return self._analisar_subconjuntos_dp()
+
+        tempo, _, _ = self._custos_subconjuntos()
+        fechos = self.fechos
+        criticas = self.habilidades_criticas
+        k = len(criticas)
+        completo = (1 << k) - 1
+        tipo_bits = np.uint64 if len(self.habilidades) <= 64 else object
+        fechos_criticas = np.array([fechos[i] for i in self.indices_criticas], dtype=tipo_bits)
+        classificar = functools.partial(_classificar_permutacoes, fechos_criticas)
+
+        n_perms = math.factorial(k)
+        n_processos = n_processos or os.cpu_count() or 1
+        if n_processos == 1:
+            parciais = [classificar(0, n_perms)]
+        else:
+            tamanho_bloco = -(-n_perms // (n_processos * 4))
+            inicios = range(0, n_perms, tamanho_bloco)
+            fins = [min(inicio + tamanho_bloco, n_perms) for inicio in inicios]
+            with ProcessPoolExecutor(max_workers=n_processos) as executor:
+                parciais = list(executor.map(classificar, inicios, fins))
+
+        # Classes em colunas: uma mesma chave pode aparecer em vários blocos, então as
+        # ocorrências são somadas e a posição representante é a menor entre eles
+        chaves = np.concatenate([c for c, _, _ in parciais])
+        _, inverso = np.unique(chaves, axis=0, return_inverse=True)
+        inverso = inverso.reshape(-1)
+        n_classes = int(inverso.max()) + 1
+        posicoes = np.full(n_classes, n_perms, dtype=np.int64)
+        np.minimum.at(posicoes, inverso, np.concatenate([p for _, p, _ in parciais]))
+        ocorrencias = np.zeros(n_classes, dtype=np.int64)
+        np.add.at(ocorrencias, inverso, np.concatenate([o for _, _, o in parciais]))
+
+        # O custo de uma ordem é a soma dos incrementos tempo[prefixo + c] - tempo[prefixo]
+        # ao longo dos seus prefixos, que telescopa para tempo[completo]
+        custo = tempo[completo]
+        # Seleção parcial das N_MELHORES (por posição, já que o custo é o mesmo) em O(classes)
+        if n_classes > self.N_MELHORES:
+            melhores = np.argpartition(posicoes, self.N_MELHORES)[:self.N_MELHORES]
+        else:
+            melhores = np.arange(n_classes)
+        melhores = melhores[np.argsort(posicoes[melhores])]
+        representantes = _desfazer_lehmer(k, posicoes[melhores])
+        return {
+            'melhores': [
+                {
+                    'permutacao': tuple(criticas[j] for j in perm),
+                    'custo_total': custo,
+                    'ocorrencias': n
+                }
+                for perm, n in zip(representantes.tolist(), ocorrencias[melhores].tolist())
+            ],
+            'total_permutacoes': n_perms,
+            'total_classes': n_classes,
+            'custo_pior': custo,
+            'custo_medio': float(custo * ocorrencias.sum() / n_perms)
+        }
+
+    def _analisar_subconjuntos_dp(self):
+        """
+        Caminho para muitas habilidades críticas: enumerar as k! ordens é
+        inviável (memória O(k!)), então só a ordem ótima da DP sobre subconjuntos
+        é devolvida (memória O(2^k)), no mesmo formato de resumo. Ela representa
+        todas as k! ordens, já que o custo não depende da ordem.
+        """
+        _, melhor, anterior = self._custos_subconjuntos()
+        k = len(self.habilidades_criticas)
+        completo = (1 << k) - 1
+        ordem = []
+        mascara = completo
+        while mascara:
+            j = anterior[mascara]
+            ordem.append(self.habilidades_criticas[j])
+            mascara ^= 1 << j
+        logging.info(
+            f"{k} habilidades críticas (limite {self.LIMITE_PERMUTACOES}): permutações não enumeradas, "
+            f"apenas a ordem ótima da DP sobre subconjuntos"
+        )
+        return {
+            'melhores': [{
+                'permutacao': tuple(reversed(ordem)),
+                'custo_total': melhor[completo],
+                'ocorrencias': math.factorial(k)
+            }],
+            'total_permutacoes': math.factorial(k),
+            'total_classes': 1,
+            'custo_pior': melhor[completo],
+            'custo_medio': float(melhor[completo])
+        }
+
+    def gerar_relatorio(self, resumo):
+        melhores = resumo['melhores'][:3]
         estatisticas = {
-            'total_permutacoes': len(custos),
+            'total_permutacoes': resumo['total_permutacoes'],
             'custo_melhor': melhores[0]['custo_total'],
-            'custo_pior': custos[-1]['custo_total'],
-            'custo_medio': custo_medio
+            'custo_pior': resumo['custo_pior'],
+            'custo_medio': resumo['custo_medio']
         }
         melhores_permutacoes = [
             {**m, 'eficiencia': estatisticas['custo_melhor'] / m['custo_total']} for m in melhores
@@ -102,17 +317,79 @@ class VerificadorDesafio2:
             'heuristica': heuristica
         }
 
-    def gerar_visualizacao(self, custos):
+    def gerar_visualizacao(self, resumo):
+        # Importado só aqui: quem não pede a figura não paga o custo do matplotlib
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10,6))
-        perm_labels = [f"{' → '.join(list(x['permutacao']))}" for x in custos[:10]]
-        perm_costs = [x['custo_total'] for x in custos[:10]]
-        ax.barh(perm_labels, perm_costs, color='steelblue')
+        top10 = resumo['melhores'][:10]
+        perm_labels = [' → '.join(x['permutacao']) for x in top10]
+        perm_costs = [x['custo_total'] for x in top10]
+        # Posições numéricas + rótulos fixos: evita o eixo categórico do matplotlib
+        posicoes = np.arange(len(perm_labels))
+        ax.barh(posicoes, perm_costs, color='steelblue')
+        ax.set_yticks(posicoes)
+        ax.set_yticklabels(perm_labels)
         ax.set_xlabel("Tempo Total (h)")
         ax.set_title("Top 10 Ordens das Permutações Críticas")
         plt.tight_layout()
         return fig
 
-def executar_desafio2(habilidades, habilidades_criticas):
+def _desfazer_lehmer(k, posicoes):
+    """
+    Permutações de range(k) nas posições dadas da ordem de itertools.permutations,
+    como matriz int8 e sem tuplas intermediárias: cada posição é convertida no seu
+    código de Lehmer, cujo j-ésimo dígito escolhe o elemento ainda disponível da coluna j.
+    """
+    posicoes = np.asarray(posicoes, dtype=np.int64)
+    n_perms = len(posicoes)
+    perms = np.empty((n_perms, k), dtype=np.int8)
+    disponiveis = np.ones((n_perms, k), dtype=bool)
+    linhas = np.arange(n_perms)
+    for j in range(k):
+        digito = (posicoes // math.factorial(k - 1 - j)) % (k - j)
+        # Primeira coluna em que a contagem de disponíveis passa do dígito
+        escolhido = (np.cumsum(disponiveis, axis=1) > digito[:, None]).argmax(axis=1)
+        perms[:, j] = escolhido
+        disponiveis[linhas, escolhido] = False
+    return perms
+
+@functools.lru_cache(maxsize=32)
+def _matriz_permutacoes(k, inicio, fim):
+    """
+    Linhas [inicio, fim) de itertools.permutations(range(k)), memoizadas (dependem
+    só de k e do bloco) e devolvidas somente leitura.
+    """
+    perms = _desfazer_lehmer(k, np.arange(inicio, fim))
+    perms.flags.writeable = False
+    return perms
+
+def _classificar_permutacoes(fechos_criticas, inicio, fim):
+    """
+    Agrupa em classes as ordens de posição [inicio, fim) de
+    itertools.permutations(range(k)) (função de módulo para poder ser enviada
+    aos processos do pool). Retorna as colunas (chaves, posição da primeira
+    ordem, ocorrências), uma linha por classe, com a chave completada com -1
+    até k; as ordens em si são reconstruídas depois, só para as classes exibidas.
+    """
+    # Matriz (n_perms, k) de índices e os fechos adquiridos acumulados com OR ao longo de cada linha
+    perms = _matriz_permutacoes(len(fechos_criticas), inicio, fim)
+    fechos_perm = fechos_criticas[perms]
+    acumulado = np.bitwise_or.accumulate(fechos_perm, axis=1)
+    anterior_linha = np.zeros_like(acumulado)
+    anterior_linha[:, 1:] = acumulado[:, :-1]
+    contribui = (fechos_perm & ~anterior_linha) != 0
+
+    # Chave da classe: as críticas que contribuíram, compactadas no início da linha
+    compactacao = np.argsort(~contribui, axis=1, kind='stable')
+    chaves = np.where(
+        np.take_along_axis(contribui, compactacao, axis=1),
+        np.take_along_axis(perms, compactacao, axis=1),
+        -1
+    )
+    _, primeiras, ocorrencias = np.unique(chaves, axis=0, return_index=True, return_counts=True)
+    return chaves[primeiras], inicio + primeiras, ocorrencias
+
+def executar_desafio2(habilidades, habilidades_criticas, gerar_figura=True):
     logging.info("="*60)
     logging.info("INICIANDO DESAFIO 2 — VERIFICAÇÃO CRÍTICA")
     logging.info("="*60)
@@ -124,16 +401,17 @@ def executar_desafio2(habilidades, habilidades_criticas):
                 'sucesso': False,
                 'erro': f"Ciclos: {relatorio['ciclos']} / Pré-reqs inexistentes: {relatorio['pre_requisitos_inexistentes']}"
             }
-        custos = verificador.analisar_permutacoes()
-        report = verificador.gerar_relatorio(custos)
-        fig = verificador.gerar_visualizacao(custos)
-        return {
+        resumo = verificador.analisar_permutacoes()
+        report = verificador.gerar_relatorio(resumo)
+        resultado = {
             'sucesso': True,
             'melhores_permutacoes': report['melhores_permutacoes'],
             'estatisticas': report['estatisticas'],
-            'heuristica': report['heuristica'],
-            'figura': fig
+            'heuristica': report['heuristica']
         }
+        if gerar_figura:
+            resultado['figura'] = verificador.gerar_visualizacao(resumo)
+        return resultado
     except Exception as e:
         logging.error(f"Erro no Desafio 2: {e}")
         return {
@@ -161,6 +439,7 @@ if __name__ == "__main__":
             print(f"{i}º ordem: {' → '.join(perm['permutacao'])} | Custo: {perm['custo_total']}h | Eficiência: {perm['eficiencia']:.3f}")
         print(f"Custo médio: {resultado['estatisticas']['custo_medio']:.2f}h")
         print(f"Heurística: {resultado['heuristica']}")
+        import matplotlib.pyplot as plt
         plt.show()
     else:
         print(f"❌ Erro: {resultado['erro']}")
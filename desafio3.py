@@ -1,18 +1,37 @@
 import logging
 import numpy as np
-import matplotlib.pyplot as plt
+import math
 import time
 from itertools import combinations
-import pandas as pd
-from collections import defaultdict
 
 class AnalisadorPivoRapido:
     def __init__(self, grafo):
         self.grafo = grafo
         self.habilidades_basicas = self._identificar_habilidades_basicas()
+        # Colunas das habilidades básicas, na ordem da lista (a lista de dicts fica para os relatórios)
+        self.ids_basicas = [h['id'] for h in self.habilidades_basicas]
+        self.valores_basicas = np.array([h['valor'] for h in self.habilidades_basicas])
+        self.tempos_basicas = np.array([h['tempo'] for h in self.habilidades_basicas])
+        self.complexidades_basicas = np.array([h['complexidade'] for h in self.habilidades_basicas])
+        self.razoes_vt_basicas = np.array([h['razao_vt'] for h in self.habilidades_basicas], dtype=float)
+        # Ordem de cada critério guloso, calculada uma vez; argsort estável preserva a ordem original nos empates
+        self.ordens_gulosas = {
+            'razao_vt': np.argsort(-self.razoes_vt_basicas, kind='stable'),
+            'valor': np.argsort(-self.valores_basicas, kind='stable'),
+            'tempo': np.argsort(self.tempos_basicas, kind='stable')
+        }
         self.resultados_guloso = {}
         self.resultados_otimos = {}
         self.contraexemplos = []
+        # Resultados já calculados: os dados não mudam, e a análise completa pede
+        # as mesmas metas mais de uma vez (diretamente e via encontrar_contraexemplo)
+        self._cache_guloso = {}
+        self._cache_otimo = {}
+        self._dp = None
+        # A DP de somas da busca ótima só vale para valores e tempos inteiros não
+        # negativos; com outros dados a busca volta a enumerar as combinações
+        colunas = np.concatenate([self.valores_basicas, self.tempos_basicas]).astype(float)
+        self._somas_inteiras = bool(np.all(colunas >= 0) and np.all(colunas % 1 == 0))
     
     def _identificar_habilidades_basicas(self):
         """Identifica habilidades de nível básico (sem pré-requisitos)"""
@@ -32,58 +51,33 @@ class AnalisadorPivoRapido:
         habilidades_basicas.sort(key=lambda x: x['razao_vt'], reverse=True)
         return habilidades_basicas
     
-    def estrategia_gulosa(self, meta_adaptabilidade=15, criterio='razao_vt'):
+    def estrategia_gulosa(self, meta_adaptabilidade=15, criterio='razao_vt', incluir_historico=False):
         """
         Implementação da estratégia gulosa para habilidades básicas
+        (o histórico passo a passo só é montado, na chave 'historico', com incluir_historico=True)
         """
+        chave_cache = (meta_adaptabilidade, criterio, incluir_historico)
+        if chave_cache in self._cache_guloso:
+            return self._cache_guloso[chave_cache]
         logging.info(f"Executando estratégia gulosa com meta S ≥ {meta_adaptabilidade}, critério: {criterio}")
         
-        if criterio == 'razao_vt':
-            # Ordenar por V/T (razão valor/tempo) - critério principal
-            habilidades_ordenadas = sorted(
-                self.habilidades_basicas,
-                key=lambda h: h['razao_vt'],
-                reverse=True
-            )
-        elif criterio == 'valor':
-            # Ordenar por valor absoluto
-            habilidades_ordenadas = sorted(
-                self.habilidades_basicas,
-                key=lambda h: h['valor'],
-                reverse=True
-            )
-        elif criterio == 'tempo':
-            # Ordenar por tempo (mais rápidas primeiro)
-            habilidades_ordenadas = sorted(
-                self.habilidades_basicas,
-                key=lambda h: h['tempo']
-            )
-        else:
+        # razao_vt: V/T decrescente (critério principal); valor: maior valor; tempo: mais rápidas primeiro
+        if criterio not in self.ordens_gulosas:
             raise ValueError(f"Critério não suportado: {criterio}")
+        ordem = self.ordens_gulosas[criterio]
         
-        adaptabilidade_total = 0
-        tempo_total = 0
-        complexidade_total = 0
-        habilidades_escolhidas = []
-        historico = []
+        # Somas de prefixo (incluindo o prefixo vazio): o guloso para no primeiro prefixo que atinge a meta
+        valores_prefixo = np.concatenate(([0], np.cumsum(self.valores_basicas[ordem])))
+        atingiu = valores_prefixo >= meta_adaptabilidade
+        n_escolhidas = int(np.argmax(atingiu)) if atingiu.any() else len(ordem)
+        ordem = ordem[:n_escolhidas]
         
-        for habilidade in habilidades_ordenadas:
-            if adaptabilidade_total >= meta_adaptabilidade:
-                break
-                
-            # Adicionar habilidade
-            habilidades_escolhidas.append(habilidade['id'])
-            adaptabilidade_total += habilidade['valor']
-            tempo_total += habilidade['tempo']
-            complexidade_total += habilidade['complexidade']
-            
-            historico.append({
-                'habilidade': habilidade['id'],
-                'valor_acumulado': adaptabilidade_total,
-                'tempo_acumulado': tempo_total,
-                'razao_vt': habilidade['razao_vt'],
-                'criterio': criterio
-            })
+        valores_acumulados = valores_prefixo[1:n_escolhidas + 1].tolist()
+        tempos_acumulados = np.cumsum(self.tempos_basicas[ordem]).tolist()
+        adaptabilidade_total = valores_acumulados[-1] if n_escolhidas else 0
+        tempo_total = tempos_acumulados[-1] if n_escolhidas else 0
+        complexidade_total = self.complexidades_basicas[ordem].sum().item() if n_escolhidas else 0
+        habilidades_escolhidas = [self.ids_basicas[i] for i in ordem.tolist()]
         
         resultado = {
             'adaptabilidade_final': adaptabilidade_total,
@@ -91,58 +85,164 @@ class AnalisadorPivoRapido:
             'complexidade_total': complexidade_total,
             'habilidades_escolhidas': habilidades_escolhidas,
             'meta_atingida': adaptabilidade_total >= meta_adaptabilidade,
-            'historico': historico,
             'criterio_utilizado': criterio,
             'excesso_adaptabilidade': max(0, adaptabilidade_total - meta_adaptabilidade),
             'eficiencia': adaptabilidade_total / tempo_total if tempo_total > 0 else 0
         }
+        if incluir_historico:
+            resultado['historico'] = [
+                {
+                    'habilidade': habilidade,
+                    'valor_acumulado': valor,
+                    'tempo_acumulado': tempo,
+                    'razao_vt': razao,
+                    'criterio': criterio
+                }
+                for habilidade, valor, tempo, razao in zip(
+                    habilidades_escolhidas, valores_acumulados, tempos_acumulados,
+                    self.razoes_vt_basicas[ordem].tolist()
+                )
+            ]
         
         logging.info(f"Estratégia gulosa: S = {adaptabilidade_total}, T = {tempo_total}h, "
                     f"Habilidades: {habilidades_escolhidas}")
         
+        self._cache_guloso[chave_cache] = resultado
         return resultado
     
-    def busca_exaustiva_otima(self, meta_adaptabilidade=15, limite_tempo=200):
+    def _tabela_dp(self, inicio):
         """
-        Busca exaustiva para encontrar solução ótima
-        Considera todas as combinações possíveis de habilidades básicas
+        Tabela da DP de somas (ver _tabela_somas) com colunas até o S do incumbente
+        guloso da meta inteira `inicio`. Uma única tabela atende todas as metas:
+        as colunas não dependem da largura, então ela só é refeita, mais larga,
+        quando uma meta pede um incumbente além dela. Só para _somas_inteiras.
+        Retorna (valores, chaves, melhor, infinito).
         """
-        logging.info(f"Executando busca exaustiva com meta S ≥ {meta_adaptabilidade}")
-        start_time = time.time()
+        if self._dp is None:
+            n_habilidades = len(self.ids_basicas)
+            valores = self.valores_basicas.astype(np.int64).tolist()
+            chaves = (self.tempos_basicas.astype(np.int64) * (n_habilidades + 1) + 1).tolist()
+            self._dp = (valores, chaves, None, None)
+        valores, chaves, melhor, infinito = self._dp
+        
+        # Incumbente guloso (não vazio): habilidades_basicas já está em ordem decrescente de V/T
+        soma_valores = 0
+        if valores:
+            acumulado = np.cumsum(valores)
+            soma_valores = int(acumulado[min(np.searchsorted(acumulado, inicio), len(valores) - 1)])
+        
+        if melhor is None or melhor.shape[1] <= soma_valores:
+            melhor, infinito = _tabela_somas(valores, chaves, soma_valores)
+            self._dp = (valores, chaves, melhor, infinito)
+        return self._dp
+    
+    def _busca_dp(self, meta_adaptabilidade):
+        """
+        Ótimo pela DP de somas (ver busca_exaustiva_otima).
+        Retorna (melhor_valor, escolhidas, total_combinacoes, combinacoes_validas).
+        """
+        n_habilidades = len(self.ids_basicas)
+        inicio = max(math.ceil(meta_adaptabilidade), 0)
+        valores, chaves, melhor, infinito = self._tabela_dp(inicio)
+        
+        # Menor S ≥ meta alcançável por um subconjunto não vazio (S = 0 só com habilidades de valor 0)
+        melhor_valor = float('inf')
+        melhor_chave = None
+        for s in np.flatnonzero(melhor[0, inicio:] < infinito) + inicio:
+            if s > 0:
+                melhor_valor, melhor_chave = int(s), int(melhor[0, s])
+                break
+            chaves_nulas = [c for v, c in zip(valores, chaves) if v == 0]
+            if chaves_nulas:
+                melhor_valor, melhor_chave = 0, min(chaves_nulas)
+                break
         
-        n_habilidades = len(self.habilidades_basicas)
-        melhor_valor = float('inf')  # Queremos o mínimo que atinja a meta
-        melhor_combinacao = []
+        # Reconstrução: a cada passo a menor habilidade j que ainda completa a chave ótima
+        escolhidas = []
+        if melhor_chave is not None:
+            restante_s, restante_chave, j = melhor_valor, melhor_chave, 0
+            while restante_chave:
+                while not (valores[j] <= restante_s and
+                           melhor[j + 1, restante_s - valores[j]] + chaves[j] == restante_chave):
+                    j += 1
+                escolhidas.append(j)
+                restante_s -= valores[j]
+                restante_chave -= chaves[j]
+                j += 1
+        
+        # Subconjuntos não vazios que atingem a meta: todos menos os de soma abaixo dela
+        contagem = np.zeros(inicio, dtype=object)
+        if inicio:
+            contagem[0] = 1
+        for v in valores:
+            contagem[v:] = contagem[v:] + contagem[:max(inicio - v, 0)]
+        total_combinacoes = 2 ** n_habilidades - 1
+        combinacoes_validas = 2 ** n_habilidades - int(contagem.sum()) - (inicio == 0)
+        
+        return melhor_valor, escolhidas, total_combinacoes, combinacoes_validas
+    
+    def _busca_enumerada(self, meta_adaptabilidade, limite_tempo, start_time):
+        """
+        Ótimo por enumeração das combinações, para dados fora do alcance da DP de
+        somas. combinations gera os tamanhos em ordem crescente e só um S ou um
+        tempo estritamente menor troca a melhor, então o desempate é o da DP.
+        Retorna (melhor_valor, escolhidas, total_combinacoes, combinacoes_validas).
+        """
+        valores = self.valores_basicas.tolist()
+        tempos = self.tempos_basicas.tolist()
+        n_habilidades = len(valores)
+        melhor_valor = float('inf')
         melhor_tempo = 0
-        melhor_complexidade = 0
+        escolhidas = []
         total_combinacoes = 0
         combinacoes_validas = 0
         
-        # Gerar todas as combinações possíveis
         for r in range(1, n_habilidades + 1):
-            for combinacao in combinations(self.habilidades_basicas, r):
+            for combinacao in combinations(range(n_habilidades), r):
                 total_combinacoes += 1
-                
-                # Calcular métricas da combinação
-                valor_total = sum(h['valor'] for h in combinacao)
-                tempo_total = sum(h['tempo'] for h in combinacao)
-                complexidade_total = sum(h['complexidade'] for h in combinacao)
-                
-                # Verificar se atinge a meta e é melhor que a atual
-                if (valor_total >= meta_adaptabilidade and 
-                    (valor_total < melhor_valor or 
-                    (valor_total == melhor_valor and tempo_total < melhor_tempo))):
-                    
-                    melhor_valor = valor_total
-                    melhor_combinacao = [h['id'] for h in combinacao]
-                    melhor_tempo = tempo_total
-                    melhor_complexidade = complexidade_total
+                valor_total = sum(valores[j] for j in combinacao)
+                if valor_total >= meta_adaptabilidade:
                     combinacoes_validas += 1
+                    tempo_total = sum(tempos[j] for j in combinacao)
+                    if (valor_total < melhor_valor or
+                            (valor_total == melhor_valor and tempo_total < melhor_tempo)):
+                        melhor_valor, melhor_tempo, escolhidas = valor_total, tempo_total, list(combinacao)
                 
-                # Verificar timeout
                 if time.time() - start_time > limite_tempo:
                     logging.warning(f"Timeout após {limite_tempo}s. Combinações testadas: {total_combinacoes}")
-                    break
+                    return melhor_valor, escolhidas, total_combinacoes, combinacoes_validas
+        
+        return melhor_valor, escolhidas, total_combinacoes, combinacoes_validas
+    
+    def busca_exaustiva_otima(self, meta_adaptabilidade=15, limite_tempo=200):
+        """
+        Busca da solução ótima: entre os subconjuntos não vazios de habilidades
+        básicas com S ≥ meta, o de menor S, desempatando pelo menor tempo, pelo
+        menor número de habilidades e pela primeira combinação na ordem de
+        itertools.combinations (o mesmo critério da enumeração exaustiva).
+
+        Em vez de enumerar as 2^n combinações, usa programação dinâmica sobre as
+        somas de valor, em O(n·V): melhor[i, s] é a menor chave tempo·(n+1) +
+        tamanho entre os subconjuntos das habilidades i..n-1 com valor exatamente
+        s. V é limitado pelo S da solução gulosa por V/T, que já é viável: nenhum
+        S acima dele pode ser o ótimo. Se valores ou tempos não forem inteiros
+        não negativos, enumera as combinações (_busca_enumerada), com o mesmo
+        critério; limite_tempo só vale para essa enumeração.
+        """
+        if meta_adaptabilidade in self._cache_otimo:
+            return self._cache_otimo[meta_adaptabilidade]
+        logging.info(f"Executando busca exaustiva com meta S ≥ {meta_adaptabilidade}")
+        start_time = time.time()
+        
+        if self._somas_inteiras:
+            melhor_valor, escolhidas, total_combinacoes, combinacoes_validas = self._busca_dp(meta_adaptabilidade)
+        else:
+            melhor_valor, escolhidas, total_combinacoes, combinacoes_validas = self._busca_enumerada(
+                meta_adaptabilidade, limite_tempo, start_time)
+        
+        melhor_combinacao = [self.ids_basicas[j] for j in escolhidas]
+        melhor_tempo = self.tempos_basicas[escolhidas].sum().item()
+        melhor_complexidade = self.complexidades_basicas[escolhidas].sum().item()
         
         end_time = time.time()
         
@@ -174,16 +274,54 @@ class AnalisadorPivoRapido:
         logging.info(f"Busca exaustiva: S = {melhor_valor}, T = {melhor_tempo}h, "
                     f"Habilidades: {melhor_combinacao}, Tempo: {resultado['tempo_execucao']:.2f}s")
         
+        self._cache_otimo[meta_adaptabilidade] = resultado
         return resultado
     
+    def _limite_inferior_tempo(self, meta_adaptabilidade):
+        """
+        Limite inferior do tempo de qualquer conjunto com S ≥ meta, pela relaxação
+        linear: habilidades fracionárias tomadas em ordem decrescente de V/T (as de
+        tempo zero primeiro), com só a última entrando em parte. Infinito se nem
+        todas juntas atingem a meta.
+        """
+        meta = max(math.ceil(meta_adaptabilidade), 0)
+        if meta == 0:
+            return 0.0
+        valores = self.valores_basicas.astype(float)
+        tempos = self.tempos_basicas.astype(float)
+        uteis = valores > 0
+        valores, tempos = valores[uteis], tempos[uteis]
+        razoes = np.divide(valores, tempos, out=np.full_like(valores, np.inf), where=tempos > 0)
+        ordem = np.argsort(-razoes, kind='stable')
+        valores_prefixo = np.concatenate(([0.0], np.cumsum(valores[ordem])))
+        tempos_prefixo = np.concatenate(([0.0], np.cumsum(tempos[ordem])))
+        if valores_prefixo[-1] < meta:
+            return float('inf')
+        k = int(np.searchsorted(valores_prefixo, meta))
+        return float(tempos_prefixo[k - 1] + (meta - valores_prefixo[k - 1]) / razoes[ordem[k - 1]])
+    
+    def _guloso_certificado_otimo(self, resultado_guloso, meta_adaptabilidade):
+        """
+        Certificado barato de que o guloso já é ótimo: se ele atinge a meta com o
+        menor S inteiro possível (⌈meta⌉) e com tempo igual ao limite inferior da
+        relaxação linear, nenhuma solução tem S menor nem, com o mesmo S, tempo
+        menor, e a busca ótima é dispensável.
+        """
+        return (resultado_guloso['meta_atingida'] and
+                resultado_guloso['adaptabilidade_final'] <= max(math.ceil(meta_adaptabilidade), 0) and
+                resultado_guloso['tempo_total'] <= self._limite_inferior_tempo(meta_adaptabilidade) + 1e-9)
+    
     def encontrar_contraexemplo(self, meta_adaptabilidade=15):
         """
         Encontra um contraexemplo onde a estratégia gulosa não é ótima
         """
         logging.info("Procurando contraexemplo para estratégia gulosa...")
         
-        # Executar ambas as estratégias
+        # Executar ambas as estratégias (a busca só se o guloso não vier com certificado de otimalidade)
         resultado_guloso = self.estrategia_gulosa(meta_adaptabilidade, 'razao_vt')
+        if self._guloso_certificado_otimo(resultado_guloso, meta_adaptabilidade):
+            logging.info("Guloso certificado ótimo pela relaxação linear: sem contraexemplo")
+            return None
         resultado_otimo = self.busca_exaustiva_otima(meta_adaptabilidade)
         
         contraexemplo = None
@@ -256,10 +394,11 @@ class AnalisadorPivoRapido:
                 'explicacao': 'Ordenação das habilidades + seleção gulosa'
             },
             'exaustiva': {
-                'complexidade_temporal': 'O(2^n)',
-                'complexidade_espacial': 'O(n)',
-                'explicacao': 'Geração de todas as combinações possíveis',
-                'combinacoes_totais': 2**n - 1
+                'complexidade_temporal': 'O(n·V)',
+                'complexidade_espacial': 'O(n·V)',
+                'explicacao': 'Programação dinâmica sobre as somas de valor (V = S do incumbente guloso)',
+                'combinacoes_totais': 2**n - 1,
+                'tipo_tabela': _tipo_tabela(int(self.tempos_basicas.sum()) * (n + 1) + n).name
             },
             'viabilidade': {
                 'n_limite_pratico': 20,
@@ -283,6 +422,11 @@ class AnalisadorPivoRapido:
         
         logging.info(f"Iniciando análise completa para metas: {metas_adaptabilidade}")
         
+        # Uma só DP de somas atende todas as metas: a tabela já nasce com a largura da maior
+        if metas_adaptabilidade:
+            if self._somas_inteiras:
+                self._tabela_dp(max(max(math.ceil(m), 0) for m in metas_adaptabilidade))
+        
         for meta in metas_adaptabilidade:
             logging.info(f"Analisando meta S ≥ {meta}")
             
@@ -426,28 +570,21 @@ class AnalisadorPivoRapido:
         print("-" * 45)
         
         metas_analisadas = list(analise_completa['guloso'].keys())
-        desempenho_guloso = []
+        gulosos = [analise_completa['guloso'][meta]['razao_vt'] for meta in metas_analisadas]
+        otimos = [analise_completa['otimo'][meta] for meta in metas_analisadas]
         
-        for meta in metas_analisadas:
-            guloso = analise_completa['guloso'][meta]['razao_vt']
-            otimo = analise_completa['otimo'][meta]
-            
-            if guloso['meta_atingida'] and otimo['meta_atingida']:
-                # Calcular proximidade do ótimo
-                diferenca_adaptabilidade = abs(guloso['adaptabilidade_final'] - otimo['adaptabilidade_final'])
-                diferenca_tempo = abs(guloso['tempo_total'] - otimo['tempo_total'])
-                
-                desempenho_guloso.append({
-                    'meta': meta,
-                    'diferenca_adaptabilidade': diferenca_adaptabilidade,
-                    'diferenca_tempo': diferenca_tempo,
-                    'eficiencia_guloso': guloso['eficiencia'],
-                    'eficiencia_otimo': otimo['eficiencia']
-                })
+        # Colunas por meta, só das metas atingidas pelas duas estratégias
+        ambas = np.array([g['meta_atingida'] and o['meta_atingida'] for g, o in zip(gulosos, otimos)], dtype=bool)
+        def coluna(resultados, chave):
+            return np.array([r[chave] for r in resultados])[ambas] if len(resultados) else np.array([])
         
-        if desempenho_guloso:
-            avg_diff_adapt = np.mean([d['diferenca_adaptabilidade'] for d in desempenho_guloso])
-            avg_diff_tempo = np.mean([d['diferenca_tempo'] for d in desempenho_guloso])
+        # Calcular proximidade do ótimo
+        diferencas_adaptabilidade = np.abs(coluna(gulosos, 'adaptabilidade_final') - coluna(otimos, 'adaptabilidade_final'))
+        diferencas_tempo = np.abs(coluna(gulosos, 'tempo_total') - coluna(otimos, 'tempo_total'))
+        
+        if ambas.any():
+            avg_diff_adapt = diferencas_adaptabilidade.mean()
+            avg_diff_tempo = diferencas_tempo.mean()
             
             print(f"  Média diferença adaptabilidade: {avg_diff_adapt:.2f} pontos")
             print(f"  Média diferença tempo: {avg_diff_tempo:.2f} horas")
@@ -464,6 +601,21 @@ class AnalisadorPivoRapido:
         else:
             print("  📊 Dados insuficientes para análise de aceitabilidade")
         
+        # Formato de dicionários montado uma vez, a partir das colunas
+        desempenho_guloso = [
+            {
+                'meta': meta,
+                'diferenca_adaptabilidade': diferenca_adaptabilidade,
+                'diferenca_tempo': diferenca_tempo,
+                'eficiencia_guloso': eficiencia_guloso,
+                'eficiencia_otimo': eficiencia_otimo
+            }
+            for meta, diferenca_adaptabilidade, diferenca_tempo, eficiencia_guloso, eficiencia_otimo in zip(
+                np.array(metas_analisadas)[ambas].tolist(), diferencas_adaptabilidade.tolist(),
+                diferencas_tempo.tolist(), coluna(gulosos, 'eficiencia').tolist(), coluna(otimos, 'eficiencia').tolist()
+            )
+        ]
+        
         return {
             'analise_completa': analise_completa,
             'contraexemplos': analise_completa['contraexemplos'],
@@ -472,6 +624,8 @@ class AnalisadorPivoRapido:
     
     def gerar_visualizacao_completa(self, analise_completa):
         """Gera visualização completa para o Desafio 3"""
+        # Importado só aqui: quem quer apenas os resultados numéricos não paga o custo do matplotlib
+        import matplotlib.pyplot as plt
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
         fig.suptitle('Desafio 3 — Análise: Estratégia Gulosa vs Solução Ótima\n(Pivô Mais Rápido - Habilidades Básicas)', 
                     fontsize=16, weight='bold')
@@ -545,6 +699,7 @@ class AnalisadorPivoRapido:
         ax3.axvline(meta_principal, color='red', linestyle='--', alpha=0.5)
         
         # Gráfico 4: Análise de Contraexemplos
+        from collections import defaultdict
         contraexemplos_por_meta = defaultdict(list)
         for ce in analise_completa['contraexemplos']:
             contraexemplos_por_meta[ce['meta']].append(ce)
@@ -571,9 +726,42 @@ class AnalisadorPivoRapido:
         plt.tight_layout()
         return fig
 
-def executar_desafio3(grafo, metas_adaptabilidade=None):
+def _tipo_tabela(soma_chaves):
     """
-    Função principal do Desafio 3
+    Menor inteiro (int16, int32 ou int64) em que cabem as chaves da DP de somas:
+    toda soma de chaves fica abaixo de infinito = máximo // 2, e infinito mais
+    uma chave ainda não transborda. Tabelas menores cortam a banda de memória
+    de cada atualização de linha.
+    """
+    for tipo in (np.int16, np.int32):
+        if soma_chaves < np.iinfo(tipo).max // 2:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
+def _tabela_somas(valores, chaves, soma_maxima):
+    """
+    Tabela de sufixos da DP de somas: melhor[i, s] é a menor soma de chaves entre
+    os subconjuntos de i..n-1 com valor exatamente s (s até soma_maxima), e
+    infinito onde s é inalcançável. Cada habilidade atualiza uma linha inteira
+    com uma única operação vetorizada (a linha i só depende da i+1), então não
+    sobra laço Python sobre as somas. Retorna (melhor, infinito).
+    """
+    n = len(valores)
+    tipo = _tipo_tabela(sum(chaves))
+    infinito = np.iinfo(tipo).max // 2
+    melhor = np.full((n + 1, soma_maxima + 1), infinito, dtype=tipo)
+    melhor[n, 0] = 0
+    for i in range(n - 1, -1, -1):
+        v = valores[i]
+        melhor[i] = melhor[i + 1]
+        if v <= soma_maxima:
+            np.minimum(melhor[i, v:], melhor[i + 1, :soma_maxima + 1 - v] + chaves[i], out=melhor[i, v:])
+    return melhor, infinito
+
+def executar_desafio3(grafo, metas_adaptabilidade=None, gerar_figura=True):
+    """
+    Função principal do Desafio 3 (com gerar_figura=False o matplotlib nem é importado
+    e o resultado sai sem a chave 'figura')
     """
     logging.info("=" * 60)
     logging.info("INICIANDO DESAFIO 3 - PIVÔ MAIS RÁPIDO")
@@ -590,20 +778,22 @@ def executar_desafio3(grafo, metas_adaptabilidade=None):
         # Gerar relatório
         relatorio = analisador.gerar_relatorio_detalhado(analise_completa)
         
-        # Gerar visualização
-        print("📊 Gerando visualizações...")
-        fig = analisador.gerar_visualizacao_completa(analise_completa)
-        
-        logging.info("Desafio 3 executado com sucesso")
-        
-        return {
+        resultado = {
             'sucesso': True,
             'analise_completa': analise_completa,
             'relatorio': relatorio,
-            'figura': fig,
             'contraexemplos': analisador.contraexemplos
         }
         
+        # Gerar visualização
+        if gerar_figura:
+            print("📊 Gerando visualizações...")
+            resultado['figura'] = analisador.gerar_visualizacao_completa(analise_completa)
+        
+        logging.info("Desafio 3 executado com sucesso")
+        
+        return resultado
+        
     except Exception as e:
         logging.error(f"Erro no Desafio 3: {e}")
         return {
@@ -623,6 +813,7 @@ if __name__ == "__main__":
     
     if resultado['sucesso']:
         print("\n🎉 Desafio 3 concluído com sucesso!")
+        import matplotlib.pyplot as plt
         plt.show()  # Mostrar gráficos
     else:
         print(f"❌ Erro: {resultado['erro']}")
\ No newline at end of file
@@ -1,21 +1,29 @@
 import logging
 import numpy as np
 import matplotlib.pyplot as plt
-import time
 import timeit
-import random
-import pandas as pd
-from collections import defaultdict
+from operator import itemgetter
 
 class OrdenadorHabilidades:
+    # Faixas até este tamanho vão direto para o Insertion Sort; fica abaixo das 12
+    # habilidades do projeto para que elas ainda passem por merges e partições
+    LIMIAR_INSERCAO = 8
+    
     def __init__(self, grafo):
         self.grafo = grafo
         self.habilidades_lista = self._preparar_dados_ordenacao()
+        self.habilidades_array = self._preparar_array_ordenacao()
+        self._cache_ordenacoes = {}
         
     def _preparar_dados_ordenacao(self):
         """Prepara a lista de habilidades para ordenação"""
+        # Razão valor/tempo de todas as habilidades numa única divisão (Tempo 0 fica com 0)
+        tempos = np.array([dados['Tempo'] for dados in self.grafo.values()], dtype=float)
+        valores = np.array([dados['Valor'] for dados in self.grafo.values()], dtype=float)
+        razoes_vt = np.divide(valores, tempos, out=np.zeros_like(valores), where=tempos > 0).tolist()
+        
         habilidades = []
-        for habilidade_id, dados in self.grafo.items():
+        for (habilidade_id, dados), razao_vt in zip(self.grafo.items(), razoes_vt):
             habilidades.append({
                 'ID': habilidade_id,
                 'Nome': dados['Nome'],
@@ -23,50 +31,90 @@ class OrdenadorHabilidades:
                 'Valor': dados['Valor'],
                 'Complexidade': dados['Complexidade'],
                 'Pre_Reqs': dados['Pre_Reqs'],
-                'Razao_VT': dados['Valor'] / dados['Tempo'] if dados['Tempo'] > 0 else 0
+                'Razao_VT': razao_vt
             })
         return habilidades
     
+    def _preparar_array_ordenacao(self):
+        """
+        Colunas numéricas de habilidades_lista, na mesma ordem, como array
+        estruturado (uma coluna contígua por critério) para a ordenação vetorizada;
+        o resultado é mapeado de volta para habilidades_lista pelos índices
+        """
+        return np.array(
+            [(h['Tempo'], h['Valor'], h['Complexidade'], h['Razao_VT'])
+             for h in self.habilidades_lista],
+            dtype=[('Tempo', 'f8'), ('Valor', 'f8'), ('Complexidade', 'f8'), ('Razao_VT', 'f8')]
+        )
+    
+    def _chaves(self, arr, criterio):
+        """
+        Chave de ordenação de cada item, extraída uma única vez por ordenação
+        (decorate-sort-undecorate): os laços dos algoritmos comparam só as chaves
+        """
+        if criterio not in ('Complexidade', 'Tempo', 'Valor', 'Razao_VT'):
+            raise ValueError(f"Critério não suportado: {criterio}")
+        return list(map(itemgetter(criterio), arr))
+    
     def merge_sort(self, arr, criterio='Complexidade'):
         """
-        Implementação completa do Merge Sort
+        Implementação completa do Merge Sort (natural: aproveita as corridas já
+        ordenadas da entrada, então uma lista já ordenada sai em O(n))
         """
         if len(arr) <= 1:
             return arr
         
-        # Dividir
-        mid = len(arr) // 2
-        left_half = self.merge_sort(arr[:mid], criterio)
-        right_half = self.merge_sort(arr[mid:], criterio)
+        chaves = self._chaves(arr, criterio)
+        corridas = self._corridas_naturais(list(range(len(arr))), chaves)
         
-        # Combinar
-        return self._merge(left_half, right_half, criterio)
+        # Combinar corridas vizinhas, duas a duas, até sobrar uma
+        while len(corridas) > 1:
+            corridas = [
+                self._merge(corridas[k], corridas[k + 1], chaves) if k + 1 < len(corridas) else corridas[k]
+                for k in range(0, len(corridas), 2)
+            ]
+        
+        return [arr[i] for i in corridas[0]]
     
-    def _merge(self, left, right, criterio):
+    def _corridas_naturais(self, indices, chaves):
+        """
+        Divide os índices em corridas já ordenadas pelas chaves. Corridas
+        estritamente decrescentes são invertidas (sem quebrar a estabilidade) e as
+        curtas são completadas até LIMIAR_INSERCAO com Insertion Sort
+        """
+        n = len(indices)
+        corridas = []
+        inicio = 0
+        
+        while inicio < n:
+            fim = inicio + 1
+            if fim < n and chaves[indices[fim]] < chaves[indices[inicio]]:
+                while fim < n and chaves[indices[fim]] < chaves[indices[fim - 1]]:
+                    fim += 1
+                indices[inicio:fim] = indices[inicio:fim][::-1]
+            else:
+                while fim < n and chaves[indices[fim]] >= chaves[indices[fim - 1]]:
+                    fim += 1
+            
+            if fim - inicio < self.LIMIAR_INSERCAO:
+                fim = min(inicio + self.LIMIAR_INSERCAO, n)
+                self._insercao_indices(indices, chaves, inicio, fim - 1)
+            
+            corridas.append(indices[inicio:fim])
+            inicio = fim
+        
+        return corridas
+    
+    def _merge(self, left, right, chaves):
         """
         Função de merge para o Merge Sort
         """
         result = []
         i = j = 0
+        n_left, n_right = len(left), len(right)
         
-        while i < len(left) and j < len(right):
-            # Comparar baseado no critério
-            if criterio == 'Complexidade':
-                left_val = left[i]['Complexidade']
-                right_val = right[j]['Complexidade']
-            elif criterio == 'Tempo':
-                left_val = left[i]['Tempo']
-                right_val = right[j]['Tempo']
-            elif criterio == 'Valor':
-                left_val = left[i]['Valor']
-                right_val = right[j]['Valor']
-            elif criterio == 'Razao_VT':
-                left_val = left[i]['Razao_VT']
-                right_val = right[j]['Razao_VT']
-            else:
-                raise ValueError(f"Critério não suportado: {criterio}")
-            
-            if left_val <= right_val:
+        while i < n_left and j < n_right:
+            if chaves[left[i]] <= chaves[right[j]]:
                 result.append(left[i])
                 i += 1
             else:
@@ -86,59 +134,107 @@ class OrdenadorHabilidades:
         if len(arr) <= 1:
             return arr
         
-        # Escolher pivô (estratégia: elemento do meio)
-        pivot_index = len(arr) // 2
-        pivot = arr[pivot_index]
-        
-        # Particionar
-        left = []
-        right = []
-        middle = []
-        
-        for item in arr:
-            if criterio == 'Complexidade':
-                item_val = item['Complexidade']
-                pivot_val = pivot['Complexidade']
-            elif criterio == 'Tempo':
-                item_val = item['Tempo']
-                pivot_val = pivot['Tempo']
-            elif criterio == 'Valor':
-                item_val = item['Valor']
-                pivot_val = pivot['Valor']
-            elif criterio == 'Razao_VT':
-                item_val = item['Razao_VT']
-                pivot_val = pivot['Razao_VT']
-            else:
-                raise ValueError(f"Critério não suportado: {criterio}")
+        chaves = self._chaves(arr, criterio)
+        indices = list(range(len(arr)))
+        self._quick_sort_in_place(indices, chaves, 0, len(arr) - 1)
+        return [arr[i] for i in indices]
+    
+    def _quick_sort_in_place(self, indices, chaves, lo, hi):
+        """
+        Quick Sort in-place de indices[lo..hi] sobre as chaves pré-extraídas, com
+        partição em três faixas (menores, iguais e maiores que o pivô): chaves
+        repetidas, comuns em Complexidade, saem da recursão de uma vez. A faixa dos
+        iguais é reposta na ordem dos índices, então chaves iguais saem na ordem de
+        entrada, como na versão com listas. Recorre só na faixa menor e itera na
+        maior, então a pilha fica em O(log n).
+        """
+        while hi - lo >= self.LIMIAR_INSERCAO:
+            # Escolher pivô (estratégia: elemento do meio)
+            pivot_val = chaves[indices[(lo + hi) // 2]]
+            
+            # Particionar: indices[lo..lt-1] < pivô, indices[lt..gt] == pivô, indices[gt+1..hi] > pivô
+            lt, i, gt = lo, lo, hi
+            while i <= gt:
+                item_val = chaves[indices[i]]
+                if item_val < pivot_val:
+                    indices[lt], indices[i] = indices[i], indices[lt]
+                    lt += 1
+                    i += 1
+                elif item_val > pivot_val:
+                    indices[i], indices[gt] = indices[gt], indices[i]
+                    gt -= 1
+                else:
+                    i += 1
             
-            if item_val < pivot_val:
-                left.append(item)
-            elif item_val > pivot_val:
-                right.append(item)
+            # As trocas tiram os empates da ordem de entrada; reordená-los pelo índice a restaura
+            indices[lt:gt + 1] = sorted(indices[lt:gt + 1])
+            
+            if lt - lo < hi - gt:
+                self._quick_sort_in_place(indices, chaves, lo, lt - 1)
+                lo = gt + 1
             else:
-                middle.append(item)
+                self._quick_sort_in_place(indices, chaves, gt + 1, hi)
+                hi = lt - 1
         
-        # Recursão e combinação
-        return (self.quick_sort(left, criterio) + 
-                middle + 
-                self.quick_sort(right, criterio))
+        self._insercao_indices(indices, chaves, lo, hi)
+    
+    def _insercao_indices(self, indices, chaves, lo, hi):
+        """
+        Insertion Sort estável de indices[lo..hi] por (chave, índice): nas faixas
+        pequenas deixadas pelo Merge Sort e pelo Quick Sort sai mais barato que
+        continuar recorrendo
+        """
+        for k in range(lo + 1, hi + 1):
+            atual = indices[k]
+            chave = chaves[atual]
+            j = k - 1
+            while j >= lo and (chaves[indices[j]] > chave or
+                               (chaves[indices[j]] == chave and indices[j] > atual)):
+                indices[j + 1] = indices[j]
+                j -= 1
+            indices[j + 1] = atual
     
     def ordenar_nativo(self, arr, criterio='Complexidade'):
         """
         Ordenação usando o sort nativo do Python como baseline
         """
-        if criterio == 'Complexidade':
-            key_func = lambda x: x['Complexidade']
-        elif criterio == 'Tempo':
-            key_func = lambda x: x['Tempo']
-        elif criterio == 'Valor':
-            key_func = lambda x: x['Valor']
-        elif criterio == 'Razao_VT':
-            key_func = lambda x: x['Razao_VT']
-        else:
+        if criterio not in ('Complexidade', 'Tempo', 'Valor', 'Razao_VT'):
             raise ValueError(f"Critério não suportado: {criterio}")
         
-        return sorted(arr, key=key_func)
+        return sorted(arr, key=itemgetter(criterio))
+    
+    def ordenar_vetorizado(self, criterio='Complexidade'):
+        """
+        Ordenação das próprias habilidades por argsort estável do NumPy sobre a
+        coluna do critério: a ordem é a mesma do Merge Sort, sem nenhuma
+        comparação no interpretador
+        """
+        if criterio not in ('Complexidade', 'Tempo', 'Valor', 'Razao_VT'):
+            raise ValueError(f"Critério não suportado: {criterio}")
+        indices = np.argsort(self.habilidades_array[criterio], kind='stable')
+        return [self.habilidades_lista[i] for i in indices.tolist()]
+    
+    def ordenar_habilidades(self, algoritmo='merge_sort', criterio='Complexidade'):
+        """
+        Ordenação de habilidades_lista por um dos algoritmos, calculada uma vez por
+        (algoritmo, critério): a análise completa pede as mesmas ordenações várias vezes.
+        O cache guarda uma tupla e cada chamada recebe uma lista nova, que pode alterar
+        """
+        chave_cache = (algoritmo, criterio)
+        if chave_cache in self._cache_ordenacoes:
+            return list(self._cache_ordenacoes[chave_cache])
+        
+        ordenar = {
+            'merge_sort': self.merge_sort,
+            'quick_sort': self.quick_sort,
+            'sort_nativo': self.ordenar_nativo,
+        }.get(algoritmo)
+        if ordenar is None:
+            raise ValueError(f"Algoritmo não suportado: {algoritmo}")
+        
+        resultado = tuple(ordenar(self.habilidades_lista, criterio))
+        self._cache_ordenacoes[chave_cache] = resultado
+        return list(resultado)
     
     def dividir_sprints(self, habilidades_ordenadas):
         """
@@ -147,20 +243,26 @@ class OrdenadorHabilidades:
         sprint_a = habilidades_ordenadas[:6]
         sprint_b = habilidades_ordenadas[6:]
         
+        # Colunas na ordem recebida, extraídas uma vez; cada sprint é uma fatia delas
+        tempos = np.array([h['Tempo'] for h in habilidades_ordenadas])
+        valores = np.array([h['Valor'] for h in habilidades_ordenadas])
+        complexidades = np.array([h['Complexidade'] for h in habilidades_ordenadas])
+        razoes_vt = np.array([h['Razao_VT'] for h in habilidades_ordenadas], dtype=float)
+        
         # Calcular métricas para cada sprint
-        def calcular_metricas(sprint):
-            tempos = [h['Tempo'] for h in sprint if h['Tempo'] > 0]
+        def calcular_metricas(fatia):
+            com_tempo = tempos[fatia] > 0
             return {
-                'total_habilidades': len(sprint),
-                'tempo_total': sum(h['Tempo'] for h in sprint),
-                'valor_total': sum(h['Valor'] for h in sprint),
-                'complexidade_media': np.mean([h['Complexidade'] for h in sprint]),
-                'complexidade_total': sum(h['Complexidade'] for h in sprint),
-                'eficiencia_media': np.mean([h['Razao_VT'] for h in sprint if h['Tempo'] > 0])
+                'total_habilidades': len(tempos[fatia]),
+                'tempo_total': tempos[fatia].sum().item(),
+                'valor_total': valores[fatia].sum().item(),
+                'complexidade_media': complexidades[fatia].mean(),
+                'complexidade_total': complexidades[fatia].sum().item(),
+                'eficiencia_media': razoes_vt[fatia][com_tempo].mean()
             }
         
-        metricas_a = calcular_metricas(sprint_a)
-        metricas_b = calcular_metricas(sprint_b)
+        metricas_a = calcular_metricas(slice(None, 6))
+        metricas_b = calcular_metricas(slice(6, None))
         
         return {
             'sprint_a': {
@@ -175,26 +277,31 @@ class OrdenadorHabilidades:
             'diferenca_complexidade': abs(metricas_a['complexidade_total'] - metricas_b['complexidade_total'])
         }
     
-    def analisar_complexidade_algoritmos(self, n_max=10000):
+    def analisar_complexidade_algoritmos(self, n_max=10000, semente=42):
         """
         Análise teórica da complexidade dos algoritmos
+        
+        A parte prática mede as ordenações em dados gerados com a semente dada,
+        então os mesmos tamanhos usam os mesmos dados a cada execução
         """
         analise = {
             'merge_sort': {
-                'melhor_caso': 'O(n log n)',
+                'melhor_caso': 'O(n)',
                 'caso_medio': 'O(n log n)',
                 'pior_caso': 'O(n log n)',
                 'estavel': True,
                 'in_place': False,
-                'explicacao': 'Divide recursivamente e combina de forma ordenada'
+                'explicacao': 'Detecta as corridas já ordenadas e as combina de forma ordenada'
             },
             'quick_sort': {
                 'melhor_caso': 'O(n log n)',
                 'caso_medio': 'O(n log n)',
                 'pior_caso': 'O(n²)',
-                'estavel': False,
+                'estavel': True,
                 'in_place': True,
-                'explicacao': 'Particiona em torno de um pivô e ordena recursivamente'
+                'explicacao': ('Particiona em torno de um pivô e ordena recursivamente; chaves iguais '
+                               'mantêm a ordem de entrada (a faixa de empates de cada pivô é reordenada '
+                               'pelo índice, numa cópia do tamanho dessa faixa)')
             },
             'sort_nativo': {
                 'melhor_caso': 'O(n log n)',
@@ -203,37 +310,55 @@ class OrdenadorHabilidades:
                 'estavel': True,
                 'in_place': False,
                 'explicacao': 'Timsort - híbrido de Merge Sort e Insertion Sort'
+            },
+            'sort_numpy': {
+                'melhor_caso': 'O(n log n)',
+                'caso_medio': 'O(n log n)',
+                'pior_caso': 'O(n log n)',
+                'estavel': True,
+                'in_place': False,
+                'explicacao': 'argsort estável sobre a coluna do critério em um array estruturado'
             }
         }
         
         # Análise prática para diferentes tamanhos
         tamanhos_testar = [100, 500, 1000, 5000]
-        resultados_tempo = defaultdict(list)
+        algoritmos_testar = ['merge_sort', 'quick_sort', 'sort_nativo']
+        
+        # Uma linha por algoritmo e uma coluna por tamanho medido
+        tempos = np.empty((len(algoritmos_testar), len(tamanhos_testar)))
+        tamanhos_medidos = []
+        # Semente fixa: os mesmos dados de teste a cada execução, para tempos comparáveis
+        rng = np.random.default_rng(semente)
         
         for tamanho in tamanhos_testar:
             if tamanho > n_max:
                 continue
                 
-            # Gerar dados de teste
-            dados_teste = [{'id': i, 'valor': random.randint(1, 100), 
-                        'Complexidade': random.randint(1, 10)} for i in range(tamanho)]
+            # Gerar dados de teste (inteiros do Python: as ordenações comparam as chaves no interpretador)
+            valores = rng.integers(1, 101, tamanho).tolist()
+            complexidades = rng.integers(1, 11, tamanho).tolist()
+            dados_teste = [{'id': i, 'valor': valor, 'Complexidade': complexidade}
+                           for i, (valor, complexidade) in enumerate(zip(valores, complexidades))]
             
             try:
-                # Medir tempos
-                tempo_merge = timeit.timeit(lambda: self.merge_sort(dados_teste.copy(), 'Complexidade'), number=3)
-                tempo_quick = timeit.timeit(lambda: self.quick_sort(dados_teste.copy(), 'Complexidade'), number=3)
-                tempo_nativo = timeit.timeit(lambda: self.ordenar_nativo(dados_teste.copy(), 'Complexidade'), number=3)
-                
-                resultados_tempo['merge_sort'].append(tempo_merge)
-                resultados_tempo['quick_sort'].append(tempo_quick)
-                resultados_tempo['sort_nativo'].append(tempo_nativo)
+                # Medir tempos (as ordenações não alteram a entrada, então a mesma
+                # lista serve a todas as repetições)
+                coluna = len(tamanhos_medidos)
+                tempos[0, coluna] = timeit.timeit(lambda: self.merge_sort(dados_teste, 'Complexidade'), number=3)
+                tempos[1, coluna] = timeit.timeit(lambda: self.quick_sort(dados_teste, 'Complexidade'), number=3)
+                tempos[2, coluna] = timeit.timeit(lambda: self.ordenar_nativo(dados_teste, 'Complexidade'), number=3)
+                tamanhos_medidos.append(tamanho)
             except Exception as e:
                 logging.warning(f"Erro no tamanho {tamanho}: {e}")
                 continue
         
         analise['resultados_praticos'] = {
-            'tamanhos': tamanhos_testar[:len(resultados_tempo['merge_sort'])],
-            'tempos': resultados_tempo
+            'tamanhos': tamanhos_medidos,
+            'tempos': {
+                algoritmo: tempos[linha, :len(tamanhos_medidos)]
+                for linha, algoritmo in enumerate(algoritmos_testar)
+            }
         }
         
         return analise
@@ -253,43 +378,41 @@ class OrdenadorHabilidades:
             try:
                 # Medir tempos
                 tempo_merge = timeit.timeit(
-                    lambda: self.merge_sort(self.habilidades_lista.copy(), criterio), 
+                    lambda: self.merge_sort(self.habilidades_lista, criterio), 
                     number=n_repeticoes
                 )
                 
                 tempo_quick = timeit.timeit(
-                    lambda: self.quick_sort(self.habilidades_lista.copy(), criterio), 
+                    lambda: self.quick_sort(self.habilidades_lista, criterio), 
                     number=n_repeticoes
                 )
                 
                 tempo_nativo = timeit.timeit(
-                    lambda: self.ordenar_nativo(self.habilidades_lista.copy(), criterio), 
+                    lambda: self.ordenar_nativo(self.habilidades_lista, criterio), 
                     number=n_repeticoes
                 )
                 
-                # Verificar correção
-                resultado_merge = self.merge_sort(self.habilidades_lista.copy(), criterio)
-                resultado_quick = self.quick_sort(self.habilidades_lista.copy(), criterio)
-                resultado_nativo = self.ordenar_nativo(self.habilidades_lista.copy(), criterio)
+                tempo_numpy = timeit.timeit(
+                    lambda: self.ordenar_vetorizado(criterio), 
+                    number=n_repeticoes
+                )
                 
-                # Extrair valores para comparação
-                def extrair_valores(resultado, criterio):
-                    if criterio == 'Complexidade':
-                        return [r['Complexidade'] for r in resultado]
-                    elif criterio == 'Tempo':
-                        return [r['Tempo'] for r in resultado]
-                    elif criterio == 'Valor':
-                        return [r['Valor'] for r in resultado]
-                    elif criterio == 'Razao_VT':
-                        return [r['Razao_VT'] for r in resultado]
+                # Verificar correção (fora das medições, com as ordenações em cache)
+                resultado_merge = self.ordenar_habilidades('merge_sort', criterio)
+                resultado_quick = self.ordenar_habilidades('quick_sort', criterio)
+                resultado_nativo = self.ordenar_habilidades('sort_nativo', criterio)
+                resultado_numpy = self.ordenar_vetorizado(criterio)
                 
-                valores_merge = extrair_valores(resultado_merge, criterio)
-                valores_quick = extrair_valores(resultado_quick, criterio)
-                valores_nativo = extrair_valores(resultado_nativo, criterio)
+                # Coluna de chaves de cada resultado, extraída uma vez e comparada em bloco
+                valores_merge = np.array(self._chaves(resultado_merge, criterio))
+                valores_quick = np.array(self._chaves(resultado_quick, criterio))
+                valores_nativo = np.array(self._chaves(resultado_nativo, criterio))
+                valores_numpy = np.array(self._chaves(resultado_numpy, criterio))
                 
                 # Verificar se todos produzem a mesma ordenação
-                correto_merge_quick = valores_merge == valores_quick
-                correto_merge_nativo = valores_merge == valores_nativo
+                correto_merge_quick = np.array_equal(valores_merge, valores_quick)
+                correto_merge_nativo = np.array_equal(valores_merge, valores_nativo)
+                correto_merge_numpy = np.array_equal(valores_merge, valores_numpy)
                 
                 resultados[criterio] = {
                     'merge_sort': {
@@ -307,7 +430,12 @@ class OrdenadorHabilidades:
                         'tempo_medio': tempo_nativo / n_repeticoes,
                         'correto': correto_merge_nativo
                     },
-                    'ordenacao_correta': correto_merge_quick and correto_merge_nativo
+                    'sort_numpy': {
+                        'tempo': tempo_numpy,
+                        'tempo_medio': tempo_numpy / n_repeticoes,
+                        'correto': correto_merge_numpy
+                    },
+                    'ordenacao_correta': correto_merge_quick and correto_merge_nativo and correto_merge_numpy
                 }
                 
             except Exception as e:
@@ -316,6 +444,7 @@ class OrdenadorHabilidades:
                     'merge_sort': {'tempo': 0, 'tempo_medio': 0, 'correto': False},
                     'quick_sort': {'tempo': 0, 'tempo_medio': 0, 'correto': False},
                     'sort_nativo': {'tempo': 0, 'tempo_medio': 0, 'correto': False},
+                    'sort_numpy': {'tempo': 0, 'tempo_medio': 0, 'correto': False},
                     'ordenacao_correta': False
                 }
         
@@ -329,7 +458,7 @@ class OrdenadorHabilidades:
         
         # 1. Ordenar por Complexidade (critério principal)
         print("📊 Ordenando habilidades por complexidade...")
-        habilidades_ordenadas_complexidade = self.merge_sort(self.habilidades_lista.copy(), 'Complexidade')
+        habilidades_ordenadas_complexidade = self.ordenar_habilidades('merge_sort', 'Complexidade')
         
         # 2. Dividir em sprints
         print("🎯 Dividindo em Sprint A e Sprint B...")
@@ -348,7 +477,7 @@ class OrdenadorHabilidades:
         ordenacoes_alternativas = {}
         for criterio in ['Tempo', 'Valor', 'Razao_VT']:
             try:
-                ordenacoes_alternativas[criterio] = self.merge_sort(self.habilidades_lista.copy(), criterio)
+                ordenacoes_alternativas[criterio] = self.ordenar_habilidades('merge_sort', criterio)
             except Exception as e:
                 logging.warning(f"Erro ao ordenar por {criterio}: {e}")
                 ordenacoes_alternativas[criterio] = []
@@ -447,8 +576,8 @@ class OrdenadorHabilidades:
         print("-" * 50)
         desempenho = analise_completa['comparacao_desempenho']['Complexidade']
         
-        algoritmos = ['merge_sort', 'quick_sort', 'sort_nativo']
-        nomes = ['Merge Sort', 'Quick Sort', 'Sort Nativo']
+        algoritmos = ['merge_sort', 'quick_sort', 'sort_nativo', 'sort_numpy']
+        nomes = ['Merge Sort', 'Quick Sort', 'Sort Nativo', 'Sort NumPy']
         
         print("   Algoritmo       | Tempo Total | Tempo Médio | Correto")
         print("   " + "-" * 50)
@@ -511,9 +640,10 @@ class OrdenadorHabilidades:
         # Gráfico 1: Habilidades Ordenadas por Complexidade
         habilidades_ordenadas = analise_completa['ordenacao_principal']
         if habilidades_ordenadas:
-            ids = [h['ID'] for h in habilidades_ordenadas]
-            complexidades = [h['Complexidade'] for h in habilidades_ordenadas]
-            tempos = [h['Tempo'] for h in habilidades_ordenadas]
+            # Colunas do gráfico numa única passada pela lista ordenada
+            ids, complexidades, tempos = zip(*(
+                (h['ID'], h['Complexidade'], h['Tempo']) for h in habilidades_ordenadas
+            ))
             
             x = np.arange(len(ids))
             largura = 0.35
@@ -545,15 +675,17 @@ class OrdenadorHabilidades:
         
         # Gráfico 2: Comparação de Desempenho dos Algoritmos
         desempenho = analise_completa['comparacao_desempenho']['Complexidade']
-        algoritmos = ['Merge Sort', 'Quick Sort', 'Sort Nativo']
+        algoritmos = ['Merge Sort', 'Quick Sort', 'Sort Nativo', 'Sort NumPy']
         tempos_medios = [
             desempenho['merge_sort']['tempo_medio'],
             desempenho['quick_sort']['tempo_medio'],
-            desempenho['sort_nativo']['tempo_medio']
+            desempenho['sort_nativo']['tempo_medio'],
+            desempenho['sort_numpy']['tempo_medio']
         ]
         
-        cores = ['lightcoral', 'lightgreen', 'lightblue']
-        bars = ax2.bar(algoritmos, tempos_medios, color=cores, edgecolor=['darkred', 'darkgreen', 'darkblue'], alpha=0.7)
+        cores = ['lightcoral', 'lightgreen', 'lightblue', 'lightyellow']
+        bars = ax2.bar(algoritmos, tempos_medios, color=cores,
+                      edgecolor=['darkred', 'darkgreen', 'darkblue', 'darkorange'], alpha=0.7)
         
         ax2.set_title('Comparação de Desempenho\n(Tempo Médio por Execução - 50 iterações)')
         ax2.set_ylabel('Tempo (segundos)')
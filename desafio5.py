@@ -3,9 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 from itertools import combinations
-from collections import defaultdict, deque
-import time
-import random
+from collections import Counter, defaultdict, deque
 
 class RecomendadorHabilidades:
     def __init__(self, grafo, cenarios_mercado, horizonte_anos=5, horas_por_ano=200):
@@ -603,10 +601,8 @@ class RecomendadorHabilidades:
             todas_recomendacoes.extend(resultado['proximas_habilidades'])
         
         if todas_recomendacoes:
-            freq_series = pd.Series(todas_recomendacoes).value_counts()
-            
-            habilidades = freq_series.index.tolist()
-            frequencias = freq_series.values.tolist()
+            # Lista curta: Counter basta, sem montar uma Series do pandas
+            habilidades, frequencias = map(list, zip(*Counter(todas_recomendacoes).most_common()))
             
             bars = ax4.bar(habilidades, frequencias, color='lightcoral', edgecolor='darkred', alpha=0.7)
             
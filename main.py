@@ -217,6 +217,7 @@ class OrchestradorMOH:
             print(f"   Merge Sort: {desempenho['merge_sort']['tempo_medio']:.6f}s")
             print(f"   Quick Sort: {desempenho['quick_sort']['tempo_medio']:.6f}s") 
             print(f"   Sort Nativo: {desempenho['sort_nativo']['tempo_medio']:.6f}s")
+            print(f"   Sort NumPy: {desempenho['sort_numpy']['tempo_medio']:.6f}s")
             
             self.resultados['desafio4'] = resultado
             